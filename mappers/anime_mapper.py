@@ -3,15 +3,18 @@ Anime mapper - merges all service data using AniDB as base ID
 File: mappers/anime_mapper.py
 """
 import json
+from array import array
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
 import sys
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.file_utils import load_json, save_json
+from mappers.id_interner import IdInterner, id_sort_key
+from mappers.mapper_state import MapperState, ServiceRecord
+from mappers.union_find import DisjointSet
 
 class AnimeMapper:
     """Maps and merges anime data from all services"""
@@ -47,15 +50,24 @@ class AnimeMapper:
         self.output_file = Path("mapped-data/anime-list-full-mapped.json")
         self.output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        # Storage
-        self.id_graph = defaultdict(lambda: defaultdict(set))  # service -> id -> set of all related IDs
-        self.all_data = {}  # (service, id) -> full item data
+        self.state_file = Path("checkpoints/anime/mapper-state.json")
+        self.init_storage()
         
         print(f"\n{'='*70}")
         print("ANIME MAPPER - Merging all service data")
         print(f"Base ID: AniDB")
         print(f"{'='*70}\n")
     
+    def init_storage(self):
+        """Create empty ID tables and cluster storage"""
+        self.ids = IdInterner()  # (service, id) <-> dense int node
+        self.id_sets = DisjointSet()  # nodes linked into clusters
+        self.item_types = array('H')  # node -> index into type_names (0 = unknown)
+        self.type_names = ['']
+        self.type_codes = {}
+        self.seasons = {}  # anidb node -> season info
+        self.state = MapperState(self.state_file)
+    
     def load_all_data(self):
         """Load data from all service files"""
         print("Step 1: Loading data from all services...")
@@ -71,79 +83,108 @@ class AnimeMapper:
                 data = load_json(filepath)
                 print(f"  ✓ {service}: {len(data)} items")
                 
-                for item in data:
-                    item_id = item.get('id')
-                    if not item_id:
-                        continue
-                    
-                    # Store full data
-                    self.all_data[(service, item_id)] = item
-                    
-                    # Build ID graph
-                    external_ids = item.get('external_ids', {})
-                    all_ids = {service: item_id, **external_ids}
-                    
-                    # Link all IDs together
-                    for svc, svc_id in all_ids.items():
-                        if svc_id:
-                            self.id_graph[svc][str(svc_id)].update(
-                                (s, str(i)) for s, i in all_ids.items() if i
-                            )
+                record = self.build_record(service, data, MapperState.file_hash(filepath))
+                self.state.add_record(self, service, record)
             
             except Exception as e:
                 print(f"  [ERROR] {service}: {e}")
         
-        print(f"\nTotal items loaded: {len(self.all_data)}\n")
+        self.print_totals()
     
-    def build_cross_references(self) -> Dict[str, Dict[str, str]]:
-        """Build complete cross-reference map by connecting related IDs"""
-        print("Step 2: Building cross-references...")
+    def load_changed_data(self):
+        """Reload only the service files that changed since the saved state"""
+        print("Step 1: Loading changed service files...")
         
-        # Find all connected ID clusters using BFS
-        visited = set()
-        clusters = []
+        if not self.state.load(self):
+            print("  No usable mapper state found, loading everything\n")
+            self.init_storage()
+            self.load_all_data()
+            return
         
-        for service, id_map in self.id_graph.items():
-            for item_id in id_map.keys():
-                key = (service, item_id)
-                
-                if key in visited:
+        for service in self.SERVICES:
+            filepath = self.scraped_dir / f"{service}-anime.json"
+            
+            if not filepath.exists():
+                if service in self.state.records:
+                    print(f"  [KEEP] {service}: file not found, keeping previous data")
+                else:
+                    print(f"  [SKIP] {service}: file not found")
+                continue
+            
+            try:
+                content_hash = MapperState.file_hash(filepath)
+                previous = self.state.records.get(service)
+                if previous and previous.content_hash == content_hash:
+                    print(f"  = {service}: unchanged ({len(previous)} items)")
                     continue
                 
-                # BFS to find all connected IDs
-                cluster = set()
-                queue = [key]
-                
-                while queue:
-                    curr_service, curr_id = queue.pop(0)
-                    curr_key = (curr_service, curr_id)
-                    
-                    if curr_key in visited:
-                        continue
-                    
-                    visited.add(curr_key)
-                    cluster.add(curr_key)
-                    
-                    # Get all related IDs
-                    for related_service, related_id in self.id_graph[curr_service].get(curr_id, set()):
-                        related_key = (related_service, related_id)
-                        if related_key not in visited:
-                            queue.append(related_key)
+                data = load_json(filepath)
+                print(f"  ✓ {service}: {len(data)} items (changed)")
                 
-                if cluster:
-                    clusters.append(cluster)
+                record = self.build_record(service, data, content_hash)
+                del data
+                self.state.replace_record(self, service, record)
+            
+            except Exception as e:
+                print(f"  [ERROR] {service}: {e}")
+        
+        self.print_totals()
+    
+    def build_record(self, service: str, data: List[Dict[str, Any]], content_hash: str) -> ServiceRecord:
+        """Intern the IDs of every item in a service file"""
+        record = ServiceRecord(content_hash)
         
-        print(f"  Found {len(clusters)} unique anime clusters\n")
+        for item in data:
+            item_id = item.get('id')
+            if not item_id:
+                continue
+            
+            # All IDs of this item end up in one cluster
+            external_ids = item.get('external_ids', {})
+            nodes = [self.ids.intern(service, str(item_id))]
+            nodes.extend(
+                self.ids.intern(svc, str(svc_id))
+                for svc, svc_id in external_ids.items() if svc_id
+            )
+            
+            # Keep only the per-item fields the merge step needs
+            season = None
+            if service == 'anidb':
+                season = self.parse_season_info(item.get('metadata', {}))
+            record.add_item(nodes, self.type_code(item.get('type')), season)
+        
+        return record
+    
+    def print_totals(self):
+        """Print item and ID counts after loading"""
+        total = sum(len(record) for record in self.state.records.values())
+        print(f"\nTotal items loaded: {total}")
+        print(f"Unique IDs: {len(self.ids)}\n")
+    
+    def build_cross_references(self) -> Dict[str, Dict[str, str]]:
+        """Build complete cross-reference map by connecting related IDs"""
+        print("Step 2: Building cross-references...")
         
         # Convert clusters to ID mappings
+        # Connected ID clusters come straight out of the union-find forest
         cross_ref = {}
+        cluster_count = 0
         
-        for cluster in clusters:
+        for cluster in self.id_sets.clusters():
+            cluster_count += 1
+            
             # Collect all IDs from this cluster
             ids = {}
-            for service, item_id in cluster:
+            for node in cluster:
+                # Skip IDs no longer linked by any scraped item
+                if not self.state.live[node]:
+                    continue
+                service, item_id = self.ids.key(node)
                 normalized = self.normalize_service_name(service)
-                if normalized not in ids:
+                # Keep the smallest ID per service, so the pick does not depend
+                # on node order (which differs between incremental and full runs)
+                current = ids.get(normalized)
+                if current is None or id_sort_key(item_id) < id_sort_key(current):
                     ids[normalized] = str(item_id)
             
             # Use AniDB as primary key if available, otherwise first available
@@ -158,9 +199,23 @@ class AnimeMapper:
                         break
             
             if primary_key:
-                cross_ref[primary_key] = ids
+                # Clusters split by service spelling (e.g. mal vs myanimelist)
+                # can share a primary key; merge them rather than keep either
+                for svc, svc_id in cross_ref.get(primary_key, {}).items():
+                    if svc not in ids or id_sort_key(svc_id) < id_sort_key(ids[svc]):
+                        ids[svc] = svc_id
+                # Fixed service order, whatever order the nodes were interned in
+                cross_ref[primary_key] = {svc: ids[svc] for svc in sorted(ids, key=self.service_order)}
+        
+        print(f"  Found {cluster_count} unique anime clusters\n")
         
-        return cross_ref
+        # Clusters come out in node order, which differs between incremental
+        # and full runs; order them by primary key instead
+        def order(entry):
+            service, item_id = entry[0].split(':', 1)
+            return service, id_sort_key(item_id)
+        
+        return dict(sorted(cross_ref.items(), key=order))
     
     def merge_to_final_format(self, cross_ref: Dict[str, Dict[str, str]]) -> List[Dict[str, Any]]:
         """Merge all data into final format"""
@@ -222,41 +277,57 @@ class AnimeMapper:
         # Priority: AniList > MAL > others
         for service in ['anilist', 'mal', 'myanimelist', 'kitsu']:
             if service in id_map:
-                key = (service, id_map[service])
-                if key in self.all_data:
-                    item_type = self.all_data[key].get('type')
-                    if item_type:
-                        return item_type
+                node = self.ids.lookup(service, id_map[service])
+                if node is not None and self.item_types[node]:
+                    return self.type_names[self.item_types[node]]
         return None
     
     def extract_season_info(self, id_map: Dict[str, str]) -> Optional[Dict[str, int]]:
-        """Extract season information from AniDB source"""
+        """Look up season information recorded from the AniDB source"""
+        if 'anidb' in id_map:
+            node = self.ids.lookup('anidb', id_map['anidb'])
+            if node is not None:
+                return self.seasons.get(node)
+        return None
+    
+    def parse_season_info(self, metadata: Dict[str, Any]) -> Optional[Dict[str, int]]:
+        """Extract season information from AniDB metadata"""
         season = {}
         
-        # Get season info from AniDB data
-        if 'anidb' in id_map:
-            key = ('anidb', id_map['anidb'])
-            if key in self.all_data:
-                metadata = self.all_data[key].get('metadata', {})
-                
-                # TVDB season
-                tvdb_season = metadata.get('default_tvdb_season')
-                if tvdb_season and tvdb_season not in ['a', '0', 'movie', 'ova', '']:
-                    try:
-                        season['tvdb'] = int(tvdb_season)
-                    except (ValueError, TypeError):
-                        pass
-                
-                # TMDB season
-                tmdb_season = metadata.get('tmdb_season')
-                if tmdb_season and tmdb_season not in ['a', '0', '']:
-                    try:
-                        season['tmdb'] = int(tmdb_season)
-                    except (ValueError, TypeError):
-                        pass
+        # TVDB season
+        tvdb_season = metadata.get('default_tvdb_season')
+        if tvdb_season and tvdb_season not in ['a', '0', 'movie', 'ova', '']:
+            try:
+                season['tvdb'] = int(tvdb_season)
+            except (ValueError, TypeError):
+                pass
+        
+        # TMDB season
+        tmdb_season = metadata.get('tmdb_season')
+        if tmdb_season and tmdb_season not in ['a', '0', '']:
+            try:
+                season['tmdb'] = int(tmdb_season)
+            except (ValueError, TypeError):
+                pass
         
         return season if season else None
     
+    def type_code(self, item_type: str) -> int:
+        """Intern a type string into type_names (0 for no type)"""
+        if not item_type:
+            return 0
+        code = self.type_codes.get(item_type)
+        if code is None:
+            code = len(self.type_names)
+            self.type_names.append(item_type)
+            self.type_codes[item_type] = code
+        return code
+    
+    def service_order(self, service: str) -> Tuple[int, str]:
+        """Sort key giving services their FIELD_MAP order (unknown ones last, by name)"""
+        fields = list(self.FIELD_MAP)
+        return (fields.index(service), '') if service in self.FIELD_MAP else (len(fields), service)
+    
     def normalize_service_name(self, service: str) -> str:
         """Normalize service names"""
         mapping = {
@@ -267,14 +338,49 @@ class AnimeMapper:
         }
         return mapping.get(service.lower(), service.lower())
     
-    def run(self):
-        """Execute the mapping process"""
-        self.load_all_data()
+    def verify_full_rebuild(self, final_data: List[Dict[str, Any]]):
+        """
+        Check mapped output against a full rebuild from the service files
+        
+        Only meaningful when every service file is present: an incremental
+        run keeps the previous data of a missing file, a full rebuild does not.
+        
+        Raises:
+            Exception: If the outputs differ
+        """
+        print("Verifying against a full rebuild...")
+        full = type(self)()
+        full.load_all_data()
+        expected = full.merge_to_final_format(full.build_cross_references())
+        
+        if final_data != expected:
+            differing = sum(1 for a, b in zip(final_data, expected) if a != b)
+            differing += abs(len(final_data) - len(expected))
+            print(f"[!] Incremental output differs from a full rebuild in {differing} entries")
+            raise Exception("Incremental mapping does not match a full rebuild")
+        print(f"  ✓ Output matches a full rebuild ({len(expected)} entries)\n")
+    
+    def run(self, incremental: bool = False, verify: bool = False):
+        """
+        Execute the mapping process
+        
+        Args:
+            incremental: Reuse the saved mapper state and only reload changed files
+            verify: Compare the output with a full rebuild before saving
+        """
+        if incremental:
+            self.load_changed_data()
+        else:
+            self.load_all_data()
         cross_ref = self.build_cross_references()
         final_data = self.merge_to_final_format(cross_ref)
         
+        if verify:
+            self.verify_full_rebuild(final_data)
+        
         # Save output
         save_json(self.output_file, final_data, pretty=True)
+        self.state.save(self)
         
         print(f"{'='*70}")
         print("ANIME MAPPING COMPLETE!")
@@ -0,0 +1,72 @@
+"""
+Interning layer for (service, id) pairs used by the mappers
+File: mappers/id_interner.py
+"""
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+def id_sort_key(item_id: str) -> Tuple[int, Union[int, str]]:
+    """Sort key putting numeric IDs first, in numeric order, then the others"""
+    return (0, int(item_id)) if item_id.isdigit() else (1, item_id)
+
+class IdInterner:
+    """
+    Maps each service to a small int and each (service, id) pair to a dense node ID
+    
+    Every ID string is stored exactly once; everything else in the mappers
+    (union-find forest, per-node attributes) refers to nodes by integer.
+    """
+    
+    def __init__(self):
+        self.services: List[str] = []                # service code -> service name
+        self.service_codes: Dict[str, int] = {}      # service name -> service code
+        self.nodes_by_service: List[Dict[str, int]] = []  # service code -> id -> node
+        
+        self.node_service = array('B')  # node -> service code
+        self.node_value: List[str] = []  # node -> id string
+    
+    def __len__(self) -> int:
+        return len(self.node_value)
+    
+    def service_code(self, service: str) -> int:
+        """Return the small int code for a service, registering it if new"""
+        code = self.service_codes.get(service)
+        if code is None:
+            code = len(self.services)
+            self.services.append(service)
+            self.service_codes[service] = code
+            self.nodes_by_service.append({})
+        return code
+    
+    def intern(self, service: str, item_id: str) -> int:
+        """
+        Get the node ID for a (service, id) pair, creating it if new
+        
+        Args:
+            service: Service name
+            item_id: ID on that service (already stringified)
+        
+        Returns:
+            Dense node ID
+        """
+        code = self.service_code(service)
+        nodes = self.nodes_by_service[code]
+        
+        node = nodes.get(item_id)
+        if node is None:
+            node = len(self.node_value)
+            nodes[item_id] = node
+            self.node_service.append(code)
+            self.node_value.append(item_id)
+        return node
+    
+    def lookup(self, service: str, item_id: str) -> Optional[int]:
+        """Get the node ID for a (service, id) pair without creating it"""
+        code = self.service_codes.get(service)
+        if code is None:
+            return None
+        return self.nodes_by_service[code].get(item_id)
+    
+    def key(self, node: int) -> Tuple[str, str]:
+        """Turn a node ID back into its (service, id) pair"""
+        return self.services[self.node_service[node]], self.node_value[node]
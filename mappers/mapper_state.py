@@ -0,0 +1,284 @@
+"""
+Persisted mapper state for incremental mapping runs
+File: mappers/mapper_state.py
+"""
+import hashlib
+import json
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from utils.file_utils import load_json, save_json
+
+class ServiceRecord:
+    """
+    Items of one service file as flat node arrays
+    
+    Item i links nodes[offsets[i]:offsets[i + 1]]; the first of those is
+    the item's own (service, id) node. A service file may list the same ID
+    more than once, so several items can share an own node.
+    """
+    
+    def __init__(self, content_hash: str = ""):
+        self.content_hash = content_hash
+        self.offsets = array('l', [0])
+        self.nodes = array('l')
+        self.types = array('H')  # item -> index into the mapper's type_names
+        self.seasons: Dict[int, Dict[str, int]] = {}  # item -> season info
+        self._item_index: Optional[Dict[int, List[int]]] = None
+    
+    def __len__(self) -> int:
+        return len(self.types)
+    
+    def add_item(self, nodes: List[int], type_code: int, season: Optional[Dict[str, int]] = None):
+        """Append one item and the nodes it links"""
+        if season:
+            self.seasons[len(self.types)] = season
+        self.nodes.extend(nodes)
+        self.offsets.append(len(self.nodes))
+        self.types.append(type_code)
+        self._item_index = None
+    
+    def items(self) -> Iterator[array]:
+        """Yield the linked nodes of every item"""
+        offsets = self.offsets
+        for i in range(len(self.types)):
+            yield self.nodes[offsets[i]:offsets[i + 1]]
+    
+    def item_nodes(self, i: int) -> array:
+        """Linked nodes of item i"""
+        return self.nodes[self.offsets[i]:self.offsets[i + 1]]
+    
+    def item_index(self) -> Dict[int, List[int]]:
+        """Own node -> numbers of the items with that ID (built on first use)"""
+        if self._item_index is None:
+            offsets, nodes = self.offsets, self.nodes
+            index = {}
+            for i in range(len(self.types)):
+                index.setdefault(nodes[offsets[i]], []).append(i)
+            self._item_index = index
+        return self._item_index
+    
+    def links(self) -> Dict[int, Set[int]]:
+        """Own node -> every node linked by the items with that ID"""
+        links = {}
+        for nodes in self.items():
+            links.setdefault(nodes[0], set()).update(nodes)
+        return links
+    
+    def to_dict(self, renumber: Optional[array] = None) -> Dict[str, Any]:
+        """
+        Args:
+            renumber: Old node -> new node, when the node table was compacted
+        """
+        return {
+            "hash": self.content_hash,
+            "offsets": self.offsets.tolist(),
+            "nodes": [renumber[node] for node in self.nodes] if renumber else self.nodes.tolist(),
+            "types": self.types.tolist(),
+            "seasons": {str(i): season for i, season in self.seasons.items()}
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ServiceRecord':
+        record = cls(data["hash"])
+        record.offsets = array('l', data["offsets"])
+        record.nodes = array('l', data["nodes"])
+        record.types = array('H', data["types"])
+        record.seasons = {int(i): season for i, season in data.get("seasons", {}).items()}
+        return record
+
+class MapperState:
+    """
+    Interned node table, union-find forest and per-service records of a mapper
+    
+    Saved after every run so the next run only has to reload the service
+    files whose content hash changed, and only re-resolve the clusters
+    those changes touch.
+    """
+    
+    VERSION = 2
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.records: Dict[str, ServiceRecord] = {}
+        self.live = array('l')  # node -> number of items linking it
+    
+    @staticmethod
+    def file_hash(filepath: Path) -> str:
+        """SHA-256 of a file's content, read in chunks"""
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _grow(self, mapper):
+        """Keep per-node arrays as long as the node table"""
+        size = len(mapper.ids)
+        mapper.id_sets.grow(size)
+        self.live.extend([0] * (size - len(self.live)))
+        mapper.item_types.extend([0] * (size - len(mapper.item_types)))
+    
+    def _apply_fields(self, mapper, record: ServiceRecord, clear: bool = False):
+        """Copy (or clear) the per-item fields of a record onto its item nodes"""
+        offsets, nodes = record.offsets, record.nodes
+        for i in range(len(record)):
+            node = nodes[offsets[i]]
+            mapper.item_types[node] = 0 if clear else record.types[i]
+            if i in record.seasons:
+                if clear:
+                    mapper.seasons.pop(node, None)
+                else:
+                    mapper.seasons[node] = record.seasons[i]
+    
+    def add_record(self, mapper, service: str, record: ServiceRecord):
+        """Link the items of a service that has no previous record"""
+        self._grow(mapper)
+        self.records[service] = record
+        
+        for nodes in record.items():
+            for node in nodes:
+                self.live[node] += 1
+            mapper.id_sets.union_all(nodes)
+        
+        self._apply_fields(mapper, record)
+    
+    def replace_record(self, mapper, service: str, record: ServiceRecord):
+        """
+        Swap in a new record for a service and re-resolve the clusters it touches
+        
+        Items that only gain links are unioned in place. Clusters that lose
+        a link (removed item or dropped external ID) are reset and rebuilt
+        from the stored records of every service.
+        """
+        old = self.records.get(service)
+        if old is None:
+            self.add_record(mapper, service, record)
+            return
+        
+        self._grow(mapper)
+        id_sets = mapper.id_sets
+        find = id_sets.find
+        
+        new_links = record.links()
+        broken_roots = set()
+        for nodes in old.items():
+            links = new_links.get(nodes[0])
+            if links is None or not links.issuperset(nodes):
+                broken_roots.update(find(node) for node in nodes)
+            for node in nodes:
+                self.live[node] -= 1
+        del new_links
+        
+        self._apply_fields(mapper, old, clear=True)
+        self.records[service] = record
+        
+        if broken_roots:
+            affected = set()
+            for root in broken_roots:
+                affected.update(id_sets.members(root))
+            id_sets.reset(affected)
+            
+            # Replay the stored items that link into a rebuilt cluster; every
+            # such item's own node is a member of it, so look them up by node
+            services, node_service = mapper.ids.services, mapper.ids.node_service
+            for node in affected:
+                other_service = services[node_service[node]]
+                other = self.records.get(other_service)
+                if other is None or other_service == service:
+                    continue
+                for i in other.item_index().get(node, ()):
+                    id_sets.union_all(other.item_nodes(i))
+            
+            print(f"    Rebuilt {len(broken_roots)} clusters ({len(affected)} IDs)")
+        
+        for nodes in record.items():
+            for node in nodes:
+                self.live[node] += 1
+            id_sets.union_all(nodes)
+        
+        self._apply_fields(mapper, record)
+    
+    def save(self, mapper):
+        """
+        Write the node table, forest and records to disk
+        
+        IDs no longer linked by any item are left out and the remaining
+        nodes renumbered, so the state does not keep every ID that ever
+        dropped out of a service file. Each cluster is saved flattened
+        under its first live member.
+        """
+        ids, find = mapper.ids, mapper.id_sets.find
+        live_nodes = [node for node, count in enumerate(self.live) if count]
+        
+        size = len(live_nodes)
+        renumber = array('l', [-1]) * len(self.live)
+        parent = array('l', range(size))
+        rank = array('B', bytes(size))
+        nxt = array('l', range(size))
+        
+        first_member = {}  # old root -> new node of the cluster's first live member
+        for new, node in enumerate(live_nodes):
+            renumber[node] = new
+            first = first_member.setdefault(find(node), new)
+            if first != new:
+                parent[new] = first
+                rank[first] = 1
+                nxt[new], nxt[first] = nxt[first], new
+        
+        save_json(self.path, {
+            "version": self.VERSION,
+            "services": ids.services,
+            "node_service": [ids.node_service[node] for node in live_nodes],
+            "node_value": [ids.node_value[node] for node in live_nodes],
+            "parent": parent.tolist(),
+            "rank": rank.tolist(),
+            "next": nxt.tolist(),
+            "type_names": mapper.type_names,
+            "records": {service: record.to_dict(renumber) for service, record in self.records.items()}
+        })
+        dropped = len(self.live) - size
+        print(f"✓ Saved mapper state to {self.path}" + (f" ({dropped} unlinked IDs dropped)" if dropped else ""))
+    
+    def load(self, mapper) -> bool:
+        """
+        Restore a saved state into an empty mapper
+        
+        Returns:
+            True if a usable state was loaded, False otherwise
+        """
+        if not self.path.exists():
+            return False
+        
+        try:
+            data = load_json(self.path)
+            if data.get("version") != self.VERSION:
+                print(f"  [WARN] Mapper state version mismatch, rebuilding")
+                return False
+            
+            for service in data["services"]:
+                mapper.ids.service_code(service)
+            for code, value in zip(data["node_service"], data["node_value"]):
+                mapper.ids.intern(mapper.ids.services[code], value)
+            
+            mapper.id_sets.parent = array('l', data["parent"])
+            mapper.id_sets.rank = array('B', data["rank"])
+            mapper.id_sets.next = array('l', data["next"])
+            
+            for type_name in data["type_names"][1:]:
+                mapper.type_code(type_name)
+            
+            self._grow(mapper)
+            for service, record_data in data["records"].items():
+                record = ServiceRecord.from_dict(record_data)
+                self.records[service] = record
+                for node in record.nodes:
+                    self.live[node] += 1
+                self._apply_fields(mapper, record)
+            
+            return True
+        
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            print(f"  [WARN] Corrupted mapper state, rebuilding: {e}")
+            return False
@@ -0,0 +1,151 @@
+"""
+Disjoint-set (union-find) engine shared by the anime and manga mappers
+File: mappers/union_find.py
+"""
+from array import array
+from typing import Iterable, Iterator
+
+class DisjointSet:
+    """
+    Union-find over dense integer node IDs with path compression and union by rank
+    
+    Parent links and ranks live in flat arrays indexed by node ID, so the
+    forest costs a few bytes per node instead of a Python object per node.
+    Node IDs are expected to come from an IdInterner.
+    
+    The members of every set are also chained into a cycle through `next`,
+    so one set can be listed without scanning the whole forest.
+    """
+    
+    def __init__(self):
+        self.parent = array('l')  # node -> parent node (roots point to themselves)
+        self.rank = array('B')    # node -> rank (upper bound on tree height)
+        self.next = array('l')    # node -> next member of its set (a cycle per set)
+    
+    def __len__(self) -> int:
+        return len(self.parent)
+    
+    def grow(self, size: int):
+        """Make sure nodes 0..size-1 exist, adding new ones as singletons"""
+        parent = self.parent
+        start = len(parent)
+        if size > start:
+            parent.extend(range(start, size))
+            self.rank.extend(bytes(size - start))
+            self.next.extend(range(start, size))
+    
+    def reset(self, nodes: Iterable[int]):
+        """
+        Turn nodes back into singletons
+        
+        Only safe when the nodes make up whole sets, e.g. every member of
+        the clusters being rebuilt.
+        """
+        parent = self.parent
+        rank = self.rank
+        nxt = self.next
+        for node in nodes:
+            parent[node] = node
+            rank[node] = 0
+            nxt[node] = node
+    
+    def find(self, node: int) -> int:
+        """
+        Find the root of a node's set, compressing the path on the way
+        
+        Args:
+            node: Node ID (must already exist)
+        
+        Returns:
+            Root node ID of the set
+        """
+        parent = self.parent
+        
+        # Walk up to the root
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        
+        # Point every node on the path straight at the root
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        
+        return root
+    
+    def union(self, a: int, b: int) -> int:
+        """
+        Merge the sets containing a and b
+        
+        Returns:
+            Root of the merged set
+        """
+        root_a = self.find(a)
+        root_b = self.find(b)
+        
+        if root_a == root_b:
+            return root_a
+        
+        # Attach the shallower tree under the deeper one
+        rank = self.rank
+        if rank[root_a] < rank[root_b]:
+            root_a, root_b = root_b, root_a
+        
+        self.parent[root_b] = root_a
+        if rank[root_a] == rank[root_b]:
+            rank[root_a] += 1
+        
+        # Swapping two successors splices the member cycles into one
+        nxt = self.next
+        nxt[root_a], nxt[root_b] = nxt[root_b], nxt[root_a]
+        
+        return root_a
+    
+    def union_all(self, nodes: Iterable[int]):
+        """Merge every node of an iterable into a single set"""
+        first = None
+        for node in nodes:
+            if first is None:
+                first = self.find(node)
+            else:
+                first = self.union(first, node)
+    
+    def members(self, node: int) -> Iterator[int]:
+        """Yield every node in the same set as node (node itself first)"""
+        nxt = self.next
+        member = node
+        while True:
+            yield member
+            member = nxt[member]
+            if member == node:
+                break
+    
+    def clusters(self) -> Iterator[array]:
+        """
+        Group all nodes by set
+        
+        Membership is built with a counting sort into one flat array, so
+        no per-cluster Python sets are created.
+        
+        Yields:
+            One array('l') of node IDs per cluster, in ascending node order
+        """
+        size = len(self.parent)
+        roots = array('l', (self.find(node) for node in range(size)))
+        
+        # Count members per root, then turn counts into start offsets
+        offsets = array('l', [0]) * (size + 1)
+        for root in roots:
+            offsets[root + 1] += 1
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+        
+        members = array('l', [0]) * size
+        fill = offsets[:-1]
+        for node, root in enumerate(roots):
+            members[fill[root]] = node
+            fill[root] += 1
+        
+        for root in range(size):
+            start, end = offsets[root], offsets[root + 1]
+            if start != end:
+                yield members[start:end]
@@ -0,0 +1,249 @@
+"""
+Shared AniList GraphQL crawling for the anime and manga scrapers
+File: scrapers/anilist_base.py
+"""
+from typing import Dict, List, Any, Optional, Tuple
+from abc import abstractmethod
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scrapers.base_scraper import BaseScraper
+
+class AniListBaseScraper(BaseScraper):
+    """
+    Base class for AniList scrapers
+    
+    Several pages are fetched per HTTP request by aliasing Page fields
+    (p1: Page(page: 1), p2: Page(page: 2), ...). The number of pages per
+    request adapts: it is halved when AniList rejects the query as too
+    complex and grows back by one after each successful request, up to
+    one page less than the smallest batch that was rejected.
+    
+    In update mode only entries whose updatedAt is newer than the last
+    finished crawl are fetched (sorted UPDATED_AT_DESC) and merged into
+    the existing output by ID.
+    
+    Subclasses set MEDIA_TYPE and MEDIA_FIELDS (which must include
+    updatedAt) and implement process_media.
+    """
+    
+    API_URL = "https://graphql.anilist.co"
+    
+    MEDIA_TYPE = ""     # GraphQL MediaType: ANIME or MANGA
+    MEDIA_FIELDS = ""   # Media fields to select
+    
+    PER_PAGE = 50
+    MAX_PAGES_PER_REQUEST = 6
+    
+    def __init__(self, service_name: str, media_type: str):
+        super().__init__(service_name, media_type)
+        self.pages_per_request = self.MAX_PAGES_PER_REQUEST
+        self.pages_limit = self.MAX_PAGES_PER_REQUEST  # largest batch not yet rejected
+    
+    def get_rate_limit(self) -> float:
+        return 1.0  # 1 second between requests
+    
+    def get_rate_quotas(self) -> List[Tuple[int, float]]:
+        return [(90, 60)]  # 90/min
+    
+    def build_query(self, pages: List[int], sort: str = "ID") -> str:
+        """
+        Build one query that fetches several pages through aliases
+        
+        Args:
+            pages: Page numbers to fetch
+            sort: MediaSort value
+        
+        Returns:
+            GraphQL query string
+        """
+        aliases = "\n".join(
+            f"""
+      p{page}: Page(page: {page}, perPage: {self.PER_PAGE}) {{
+        pageInfo {{ hasNextPage currentPage lastPage }}
+        media(type: {self.MEDIA_TYPE}, sort: {sort}) {{ ...fields }}
+      }}"""
+            for page in pages
+        )
+        return f"""
+    query {{{aliases}
+    }}
+    
+    fragment fields on Media {{
+      {self.MEDIA_FIELDS}
+    }}
+    """
+    
+    def fetch_pages(self, pages: List[int], sort: str = "ID") -> Optional[Dict[str, Any]]:
+        """
+        Fetch several pages in one request
+        
+        Returns:
+            Mapping of page number -> Page data, or None if the query was
+            too complex (pages_per_request has been reduced; retry)
+        
+        Raises:
+            Exception: On other GraphQL or HTTP errors
+        """
+        try:
+            response = self.session.post(
+                self.API_URL,
+                json={'query': self.build_query(pages, sort)},
+                headers={'Content-Type': 'application/json', 'Accept': 'application/json'}
+            )
+            data = response.json()
+        except requests.exceptions.HTTPError as e:
+            # AniList rejects over-complex queries with HTTP 400
+            response = e.response
+            try:
+                data = response.json()
+            except ValueError:
+                raise e
+        
+        errors = data.get('errors')
+        if errors:
+            messages = ' '.join(str(err.get('message', err)) for err in errors).lower()
+            
+            if 'complex' in messages and len(pages) > 1:
+                self.pages_limit = min(self.pages_limit, len(pages) - 1)
+                self.pages_per_request = max(1, len(pages) // 2)
+                print(f"  Query too complex, dropping to {self.pages_per_request} pages per request")
+                return None
+            
+            if 'rate limit' in messages:
+                wait = self.session.backoff(response)
+                print(f"  Rate limited. Waiting {wait:.0f}s...")
+                return None
+            
+            raise Exception(f"GraphQL errors: {errors}")
+        
+        # Grow back slowly after a successful request
+        if self.pages_per_request < self.pages_limit:
+            self.pages_per_request += 1
+        
+        results = data.get('data') or {}
+        return {page: results.get(f"p{page}") or {} for page in pages}
+    
+    def scrape(self) -> bool:
+        """Scrape AniList data (only changed entries in update mode)"""
+        if self.mode == 'update':
+            if self.checkpoint.get('updated_at') and self.output_file.exists():
+                return self.scrape_updates()
+            print("No finished full crawl to update from, running a full crawl\n")
+        
+        return self.scrape_all()
+    
+    def scrape_all(self) -> bool:
+        """Walk the whole catalog in ID order"""
+        self.checkpoint.setdefault('crawl_started', int(time.time()))
+        
+        if not self.crawl('page', 'ID'):
+            return False
+        
+        # Anything updated after this crawl started is picked up by the next update
+        self.checkpoint['page'] = 1
+        self.checkpoint['updated_at'] = self.checkpoint.pop('crawl_started')
+        self.save_checkpoint(self.checkpoint)
+        return True
+    
+    def scrape_updates(self) -> bool:
+        """Fetch entries updated since the high-water mark and merge them into the output"""
+        since = self.checkpoint['updated_at']
+        self.checkpoint.setdefault('crawl_started', int(time.time()))
+        self.merge_existing = True
+        
+        print(f"Fetching entries updated since {time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(since))} UTC")
+        
+        if not self.crawl('update_page', 'UPDATED_AT_DESC', since):
+            return False
+        
+        self.checkpoint.pop('update_page', None)
+        self.checkpoint['updated_at'] = self.checkpoint.pop('crawl_started')
+        self.save_checkpoint(self.checkpoint)
+        return True
+    
+    def crawl(self, page_key: str, sort: str, since: Optional[int] = None) -> bool:
+        """
+        Fetch pages in order, several per request, checkpointing after each request
+        
+        Args:
+            page_key: Checkpoint key holding the next page
+            sort: MediaSort value
+            since: Stop at the first entry whose updatedAt is older than this
+                (requires sort UPDATED_AT_DESC)
+        
+        Returns:
+            True if the crawl got to the end, False if it stopped on an error
+        """
+        page = self.checkpoint.get(page_key, 1)
+        
+        print(f"Starting from page {page}...")
+        
+        while True:
+            pages = list(range(page, page + self.pages_per_request))
+            
+            try:
+                batch = self.fetch_pages(pages, sort)
+            except Exception as e:
+                print(f"  [ERROR] Pages {pages[0]}-{pages[-1]} failed: {e}")
+                # Save what we have so far
+                self.checkpoint[page_key] = page
+                self.save_checkpoint(self.checkpoint)
+                return False
+            
+            if batch is None:
+                continue
+            
+            finished = False
+            for number in pages:
+                page_data = batch[number]
+                media_list = page_data.get('media', [])
+                page_info = page_data.get('pageInfo', {})
+                
+                if not media_list:
+                    print("  No more items found")
+                    finished = True
+                    break
+                
+                page = number + 1
+                current = page_info.get('currentPage', number)
+                last = page_info.get('lastPage', '?')
+                print(f"  Page {current}/{last} - {len(media_list)} items")
+                
+                for media in media_list:
+                    if since is not None and (media.get('updatedAt') or 0) < since:
+                        print("\n✓ Reached entries unchanged since the last run")
+                        finished = True
+                        break
+                    
+                    try:
+                        item = self.process_media(media)
+                        self.add_result(item)
+                    except Exception as e:
+                        print(f"    [WARN] Failed to process media {media.get('id')}: {e}")
+                
+                if finished:
+                    break
+                
+                if not page_info.get('hasNextPage'):
+                    print("\n✓ Reached last page")
+                    finished = True
+                    break
+            
+            # Save checkpoint after each request
+            self.checkpoint[page_key] = page
+            self.save_checkpoint(self.checkpoint)
+            
+            if finished:
+                return True
+    
+    @abstractmethod
+    def process_media(self, media: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert one Media object to the standardized item format"""
+        pass
@@ -3,7 +3,7 @@ AniDB scraper - uses anime-lists XML as primary source
 File: scrapers/anime/anidb_scraper.py
 """
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
 import sys
 from pathlib import Path
 
@@ -23,26 +23,19 @@ class AniDBScraper(BaseScraper):
     def get_rate_limit(self) -> float:
         return 1.0  # 1 second between requests
     
-    def scrape(self) -> List[Dict[str, Any]]:
+    def scrape(self):
         """Scrape AniDB data from anime-lists XML"""
         print("Fetching anime-lists XML from GitHub...")
         
         try:
-            response = self.session.get(self.ANIMELISTS_URL)
+            response = self.session.get(self.ANIMELISTS_URL, cache=True)
             
             if response.status_code != 200:
                 raise Exception(f"Failed to fetch anime-lists: {response.status_code}")
             
-            print("✓ Downloaded successfully")
-            print("Parsing XML...")
+            print("✓ Connected, parsing XML as it streams in...\n")
             
-            root = ET.fromstring(response.content)
-            
-            results = []
-            total = len(root.findall('anime'))
-            print(f"Found {total} anime entries\n")
-            
-            for idx, anime in enumerate(root.findall('anime'), 1):
+            for idx, anime in enumerate(self.iter_anime(response.raw), 1):
                 try:
                     anidb_id = anime.get('anidbid')
                     if not anidb_id:
@@ -73,22 +66,46 @@ class AniDBScraper(BaseScraper):
                         metadata=metadata
                     )
                     
-                    results.append(item)
+                    self.add_result(item)
                     
                     if idx % 500 == 0:
-                        print(f"  Processed {idx}/{total} items ({idx/total*100:.1f}%)...")
+                        print(f"  Processed {idx} items...")
                 
                 except Exception as e:
                     print(f"  [WARN] Failed to process item {idx}: {e}")
                     continue
+                
+                finally:
+                    # Drop the element's subtree once it has been handled
+                    anime.clear()
             
-            print(f"\n✓ Processed all {len(results)} items")
-            return results
+            print(f"\n✓ Processed all {self.result_count} items")
             
         except Exception as e:
             print(f"\n[ERROR] Failed to scrape AniDB: {e}")
             raise
     
+    def iter_anime(self, source) -> Iterator[ET.Element]:
+        """
+        Yield each top-level <anime> element as soon as it has been parsed
+        
+        Handled elements are detached from the root, so only the element
+        being processed is kept in memory.
+        
+        Args:
+            source: File-like object with the XML bytes (download stream or cached file)
+        """
+        if hasattr(source, 'decode_content'):
+            source.decode_content = True
+        
+        root = None
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            if root is None:
+                root = elem
+            elif event == 'end' and elem.tag == 'anime':
+                yield elem
+                root.remove(elem)
+    
     def extract_external_ids(self, anime: ET.Element) -> Dict[str, str]:
         """Extract external IDs from anime-lists XML"""
         ids = {}
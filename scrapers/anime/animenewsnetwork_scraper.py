@@ -2,7 +2,8 @@
 AnimeNewsNetwork scraper - Optimized for speed
 File: scrapers/anime/animenewsnetwork_scraper.py
 """
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+import asyncio
 import sys
 from pathlib import Path
 import xml.etree.ElementTree as ET
@@ -11,20 +12,35 @@ import xml.etree.ElementTree as ET
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from scrapers.base_scraper import BaseScraper
+from utils.http_utils import AsyncRateLimitedSession
 
 class AnimeNewsNetworkScraper(BaseScraper):
-    """Scraper for AnimeNewsNetwork API - Optimized"""
+    """
+    Scraper for AnimeNewsNetwork API - Optimized
+    
+    Details are fetched in batches of IDs per api.xml request, with a few
+    batches in flight at once. Finished batches are written back in ID
+    order, so checkpoint['last_id'] is a contiguous low-water mark: every
+    ID up to it has either been saved or sits in checkpoint['retry'], the
+    queue of failed batches that is retried first on the next run.
+    """
     
     API_URL = "https://cdn.animenewsnetwork.com/encyclopedia/api.xml"
     REPORTS_URL = "https://www.animenewsnetwork.com/encyclopedia/reports.xml"
     
+    MAX_BATCH = 50          # api.xml returns at most 50 titles per request
+    MAX_URL_LENGTH = 2000   # stay well below common URL length limits
+    WORKERS = 3             # batches in flight
+    WINDOW = 10             # how far ahead of the next batch to write we fetch
+    MAX_ATTEMPTS = 3        # tries per batch before queueing it for the next run
+    
     def __init__(self):
         super().__init__("animenewsnetwork", "anime")
     
     def get_rate_limit(self) -> float:
         return 1.0  # Reduced from 2s to 1s
     
-    def scrape(self) -> List[Dict[str, Any]]:
+    def scrape(self) -> bool:
         """
         Scrape ANN data - BATCH MODE
         Fetches multiple IDs per request to speed up
@@ -32,8 +48,6 @@ class AnimeNewsNetworkScraper(BaseScraper):
         print("Fetching anime list from ANN reports...")
         print("Using BATCH mode (multiple IDs per request)\n")
         
-        results = []
-        
         try:
             # Get ID list
             print("Step 1: Fetching anime ID list...")
@@ -43,7 +57,7 @@ class AnimeNewsNetworkScraper(BaseScraper):
             
             if response.status_code != 200:
                 print(f"[!] Failed: {response.status_code}")
-                return results
+                return False
             
             print("Step 2: Parsing XML...")
             root = ET.fromstring(response.content)
@@ -61,62 +75,137 @@ class AnimeNewsNetworkScraper(BaseScraper):
             
             # Filter already processed
             last_id = self.checkpoint.get("last_id", 0)
-            ids_to_process = [id for id in all_ids if id > last_id]
+            
+            # Only new and retried IDs are fetched; keep what earlier runs saved
+            if last_id:
+                self.merge_existing = True
+            ids_to_process = sorted(id for id in all_ids if id > last_id)
             
             print(f"Step 3: Fetching details in batches...")
             print(f"To process: {len(ids_to_process)} IDs")
-            print(f"Batch size: 50 IDs per request\n")
+            print(f"Queued for retry: {sum(len(batch) for batch in self.checkpoint.get('retry', []))} IDs")
+            print(f"Batch size: up to {self.MAX_BATCH} IDs per request, {self.WORKERS} requests in flight\n")
             
-            # Process in batches of 50
-            batch_size = 50
-            processed_count = 0
+            asyncio.run(self.fetch_all(self.make_batches(ids_to_process)))
             
-            for i in range(0, len(ids_to_process), batch_size):
-                batch = ids_to_process[i:i+batch_size]
-                batch_num = (i // batch_size) + 1
-                total_batches = (len(ids_to_process) + batch_size - 1) // batch_size
-                
-                print(f"  Batch {batch_num}/{total_batches} ({len(batch)} IDs)...", end=" ")
-                
-                try:
-                    # Fetch batch
-                    ids_str = "/".join(map(str, batch))
-                    url = f"{self.API_URL}?anime={ids_str}"
+            print(f"\n✓ Total processed: {self.result_count} items")
+            if self.checkpoint.get('retry'):
+                print(f"[WARN] {len(self.checkpoint['retry'])} batches failed and will be retried next run")
+            return True
+        
+        except Exception as e:
+            print(f"[ERROR] {e}")
+            return False
+    
+    def batch_url(self, batch: List[int]) -> str:
+        """api.xml URL for a batch of IDs"""
+        return f"{self.API_URL}?anime={'/'.join(map(str, batch))}"
+    
+    def make_batches(self, ids: List[int]) -> List[List[int]]:
+        """Split IDs into batches of up to MAX_BATCH whose URL fits MAX_URL_LENGTH"""
+        batches = []
+        batch = []
+        length = len(self.batch_url([]))
+        
+        for ann_id in ids:
+            extra = len(str(ann_id)) + (1 if batch else 0)
+            if batch and (len(batch) >= self.MAX_BATCH or length + extra > self.MAX_URL_LENGTH):
+                batches.append(batch)
+                batch = []
+                length = len(self.batch_url([]))
+                extra = len(str(ann_id))
+            batch.append(ann_id)
+            length += extra
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    async def fetch_batch(self, session: AsyncRateLimitedSession, batch: List[int]) -> Optional[ET.Element]:
+        """
+        Fetch one batch, retrying on errors
+        
+        Returns:
+            Parsed response, or None if every attempt failed
+        """
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            try:
+                response = await session.get(self.batch_url(batch))
+                return ET.fromstring(response.content)
+            except Exception as e:
+                print(f"  [ERROR] Batch {batch[0]}-{batch[-1]} failed (attempt {attempt}/{self.MAX_ATTEMPTS}): {e}")
+                if attempt < self.MAX_ATTEMPTS:
+                    await asyncio.sleep(10)
+        return None
+    
+    def write_batch(self, root: ET.Element) -> int:
+        """Save every anime of a fetched batch, returning how many were saved"""
+        saved = 0
+        for anime in root.findall('.//anime'):
+            try:
+                item = self.process_anime(anime)
+                if item:
+                    self.add_result(item)
+                    saved += 1
+            except:
+                continue
+        return saved
+    
+    async def fetch_all(self, batches: List[List[int]]):
+        """Retry queued batches, then fetch new batches concurrently and write them in order"""
+        async with AsyncRateLimitedSession(self.get_rate_limit(), self.WORKERS, self.get_rate_quotas()) as session:
+            # Batches that failed in earlier runs
+            retry = self.checkpoint.get('retry', [])
+            if retry:
+                print(f"  Retrying {len(retry)} queued batches...")
+                roots = await asyncio.gather(*(self.fetch_batch(session, batch) for batch in retry))
+                still_failing = []
+                for batch, root in zip(retry, roots):
+                    if root is None:
+                        still_failing.append(batch)
+                    else:
+                        self.write_batch(root)
+                self.checkpoint['retry'] = still_failing
+                self.save_checkpoint(self.checkpoint)
+            
+            results = {}   # fetched batches waiting to be written
+            tasks: Dict[int, asyncio.Task] = {}
+            next_batch = 0  # next batch to write
+            scheduled = 0   # next batch to request
+            
+            try:
+                while next_batch < len(batches):
+                    # Keep a bounded window of batches in flight
+                    while scheduled < min(len(batches), next_batch + self.WINDOW):
+                        tasks[scheduled] = asyncio.create_task(self.fetch_batch(session, batches[scheduled]))
+                        scheduled += 1
                     
-                    response = self.session.get(url)
+                    done, _ = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_COMPLETED)
+                    for number in [number for number, task in tasks.items() if task in done]:
+                        results[number] = tasks.pop(number).result()
                     
-                    if response.status_code == 200:
-                        root = ET.fromstring(response.content)
+                    # Write every batch that is next in line
+                    while next_batch in results:
+                        batch = batches[next_batch]
+                        root = results.pop(next_batch)
                         
-                        # Process each anime in batch
-                        for anime in root.findall('.//anime'):
-                            try:
-                                item = self.process_anime(anime)
-                                if item:
-                                    results.append(item)
-                                    processed_count += 1
-                            except:
-                                continue
+                        if root is None:
+                            # Keep the IDs for the next run instead of skipping them
+                            self.checkpoint.setdefault('retry', []).append(batch)
+                            print(f"  Batch {next_batch + 1}/{len(batches)} queued for retry")
+                        else:
+                            saved = self.write_batch(root)
+                            print(f"  Batch {next_batch + 1}/{len(batches)} ({len(batch)} IDs) ✓ {saved} items")
                         
-                        print(f"✓ {processed_count} items")
-                    else:
-                        print(f"Failed ({response.status_code})")
-                    
-                    # Save checkpoint after each batch
-                    if batch:
-                        self.checkpoint['last_id'] = max(batch)
+                        # Every ID up to here is saved or queued
+                        self.checkpoint['last_id'] = batch[-1]
                         self.save_checkpoint(self.checkpoint)
-                    
-                except Exception as e:
-                    print(f"Error: {e}")
-                    continue
+                        next_batch += 1
             
-            print(f"\n✓ Total processed: {len(results)} items")
-            return results
-            
-        except Exception as e:
-            print(f"[ERROR] {e}")
-            return results
+            finally:
+                for task in tasks.values():
+                    task.cancel()
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
     
     def process_anime(self, anime: ET.Element) -> Dict[str, Any]:
         """Process anime element"""
@@ -0,0 +1,173 @@
+"""
+Page parsing backends for the Anime-Planet scraper
+File: scrapers/anime/animeplanet_parsers.py
+"""
+from typing import Dict, List, Any, Optional, Union
+from abc import ABC, abstractmethod
+from bs4 import BeautifulSoup
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.html_utils import has_class, xpath, parse_document, parse_fragment, element_text
+
+class AnimePlanetPageParser(ABC):
+    """
+    Turns a browse page into plain card fields
+    
+    Every backend returns the same structure, so the scraper does not care
+    which one parsed the page:
+        {
+            "cards": [{"ap_id", "href", "title", "alt_title", "type_text",
+                       "year_text", "tags", "image_url"}, ...],
+            "empty": bool,      # the page has no card elements at all
+            "has_next": bool,   # a next-page link is present
+            "blocked": bool     # empty and the page looks like a challenge
+        }
+    Text fields are None when the element is missing. Cards without a
+    tooltip, or that fail to parse, are left out.
+    """
+    
+    name = ""
+    
+    @abstractmethod
+    def parse_page(self, content: Union[str, bytes]) -> Dict[str, Any]:
+        """Parse a browse page into the structure described above"""
+        pass
+    
+    @abstractmethod
+    def parse_card(self, card) -> Optional[Dict[str, Any]]:
+        """Card fields of one card element, or None if it has no tooltip"""
+        pass
+    
+    def parse_cards(self, elements) -> List[Dict[str, Any]]:
+        """Parse card elements, skipping the ones that fail"""
+        cards = []
+        for element in elements:
+            try:
+                card = self.parse_card(element)
+            except Exception:
+                continue
+            if card:
+                cards.append(card)
+        return cards
+    
+    @staticmethod
+    def looks_blocked(text: str) -> bool:
+        """Cloudflare sometimes answers 200 with a captcha page"""
+        text = text.lower()
+        return "challenge" in text or "cloudflare" in text
+
+class SoupPageParser(AnimePlanetPageParser):
+    """BeautifulSoup with html.parser (pure Python, the original implementation)"""
+    
+    name = "soup"
+    
+    def parse_page(self, content: Union[str, bytes]) -> Dict[str, Any]:
+        soup = BeautifulSoup(content, 'html.parser')
+        elements = soup.select('li.card')
+        
+        return {
+            "cards": self.parse_cards(elements),
+            "empty": not elements,
+            "has_next": soup.select_one('li.next a') is not None,
+            "blocked": not elements and self.looks_blocked(soup.text)
+        }
+    
+    def parse_card(self, card: BeautifulSoup) -> Optional[Dict[str, Any]]:
+        link_tag = card.select_one('a.tooltip')
+        if not link_tag:
+            return None
+        
+        tooltip_html = link_tag.get('title', '')
+        if not tooltip_html:
+            return None
+        
+        meta_soup = BeautifulSoup(tooltip_html, 'html.parser')
+        
+        def text(tag) -> Optional[str]:
+            return tag.get_text(strip=True) if tag else None
+        
+        image = card.select_one('img')
+        return {
+            "ap_id": card.get('data-id'),
+            "href": link_tag.get('href', ''),
+            "title": text(meta_soup.find('h5', class_='theme-font')),
+            "alt_title": text(meta_soup.find('h6', class_='tooltip-alt')),
+            "type_text": text(meta_soup.select_one('.entryBar .type')),
+            "year_text": text(meta_soup.select_one('.entryBar .iconYear')),
+            "tags": [tag.get_text(strip=True) for tag in meta_soup.select('.tags li')],
+            "image_url": image.get('data-src') if image else None
+        }
+
+class LxmlPageParser(AnimePlanetPageParser):
+    """lxml (libxml2) with XPath selectors compiled once at import"""
+    
+    name = "lxml"
+    
+    CARDS = xpath(f'//li[{has_class("card")}]')
+    NEXT_LINK = xpath(f'//li[{has_class("next")}]//a')
+    TOOLTIP_LINK = xpath(f'.//a[{has_class("tooltip")}]')
+    IMAGE = xpath('.//img')
+    TITLE = xpath(f'.//h5[{has_class("theme-font")}]')
+    ALT_TITLE = xpath(f'.//h6[{has_class("tooltip-alt")}]')
+    TYPE = xpath(f'.//*[{has_class("entryBar")}]//*[{has_class("type")}]')
+    YEAR = xpath(f'.//*[{has_class("entryBar")}]//*[{has_class("iconYear")}]')
+    TAGS = xpath(f'.//*[{has_class("tags")}]//li')
+    
+    def parse_page(self, content: Union[str, bytes]) -> Dict[str, Any]:
+        root = parse_document(content)
+        elements = self.CARDS(root)
+        
+        return {
+            "cards": self.parse_cards(elements),
+            "empty": not elements,
+            "has_next": bool(self.NEXT_LINK(root)),
+            "blocked": not elements and self.looks_blocked(root.text_content())
+        }
+    
+    def parse_card(self, card) -> Optional[Dict[str, Any]]:
+        links = self.TOOLTIP_LINK(card)
+        if not links:
+            return None
+        link_tag = links[0]
+        
+        tooltip_html = link_tag.get('title', '')
+        if not tooltip_html:
+            return None
+        
+        meta = parse_fragment(tooltip_html)
+        
+        def text(selector) -> Optional[str]:
+            found = selector(meta)
+            return element_text(found[0]) if found else None
+        
+        images = self.IMAGE(card)
+        return {
+            "ap_id": card.get('data-id'),
+            "href": link_tag.get('href', ''),
+            "title": text(self.TITLE),
+            "alt_title": text(self.ALT_TITLE),
+            "type_text": text(self.TYPE),
+            "year_text": text(self.YEAR),
+            "tags": [element_text(tag) for tag in self.TAGS(meta)],
+            "image_url": images[0].get('data-src') if images else None
+        }
+
+PAGE_PARSERS = {
+    parser.name: parser for parser in (LxmlPageParser, SoupPageParser)
+}
+
+def get_page_parser(name: str = "lxml") -> AnimePlanetPageParser:
+    """
+    Create a page parser by backend name
+    
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if name not in PAGE_PARSERS:
+        print(f"[!] Unknown HTML parser '{name}'. Available: {', '.join(PAGE_PARSERS)}")
+        raise ValueError(f"Unknown HTML parser: {name}")
+    return PAGE_PARSERS[name]()
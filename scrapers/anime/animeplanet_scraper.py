@@ -2,22 +2,29 @@
 Anime-Planet scraper (Advanced: Rotates Browser Fingerprints to bypass 403/429)
 File: scrapers/anime/animeplanet_scraper.py
 """
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Union
+import asyncio
 import sys
 import time
-import random
 from pathlib import Path
-from bs4 import BeautifulSoup
 import re
-from curl_cffi import requests as cffi_requests
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from scrapers.base_scraper import BaseScraper
+from scrapers.anime.animeplanet_parsers import get_page_parser
+from utils.offline_database import get_offline_database
+from utils.session_pool import PooledSession, SessionPool
 
 class AnimePlanetScraper(BaseScraper):
-    """Scraper for Anime-Planet using Rotating TLS Fingerprints"""
+    """
+    Scraper for Anime-Planet using Rotating TLS Fingerprints
+    
+    A small pool of impersonated sessions crawls the browse pages in
+    parallel, each with its own pacing and health; a blocked session is
+    quarantined (and re-fingerprinted) while the others keep working.
+    """
     
     BASE_URL = "https://www.anime-planet.com"
     BROWSE_URL = f"{BASE_URL}/anime/all"
@@ -29,160 +36,250 @@ class AnimePlanetScraper(BaseScraper):
         "safari15_3", "safari15_5", "edge101"
     ]
     
-    def __init__(self):
+    MAX_PAGES = 760
+    UPDATE_PAGES = 15   # newest-first pages re-crawled in update mode
+    UPDATE_QUERY = "sort=year&order=desc"
+    SESSIONS = 3        # fingerprinted sessions crawling in parallel
+    WINDOW = 9          # pages queued ahead of the next page to write
+    PAGE_JITTER = 3.0   # extra random delay per request, on top of the rate limit
+    MAX_CONSECUTIVE_FAILURES = 10   # blocks/errors across the pool without a success
+    
+    def __init__(self, parser: str = "lxml"):
+        """
+        Initialize Anime-Planet scraper
+        
+        Args:
+            parser: HTML parsing backend ('lxml' or 'soup', see animeplanet_parsers)
+        """
         super().__init__("animeplanet", "anime")
+        self.parser = get_page_parser(parser)
+        # Cross-references from the offline database, fetched with the default
+        # session before it is replaced by the fingerprinted ones
+        self.offline_database = get_offline_database(self.session)
         self.session = None
-        self.current_browser = "chrome120"
     
     def get_rate_limit(self) -> float:
-        # A bit slower to be safe
-        return 6.0 
+        # A bit slower to be safe; this is per session
+        return 6.0
     
-    def get_new_session(self):
-        """Creates a new session with a random browser fingerprint"""
-        self.current_browser = random.choice(self.BROWSER_ROTATION)
-        # print(f"  [i] Switching fingerprint to: {self.current_browser}")
-        return cffi_requests.Session(impersonate=self.current_browser)
-
-    def scrape(self) -> List[Dict[str, Any]]:
+    def page_url(self, page: int, query: str = "") -> str:
+        """Browse page URL; query holds extra parameters such as a sort order"""
+        return f"{self.BROWSE_URL}?{query}&page={page}" if query else f"{self.BROWSE_URL}?page={page}"
+    
+    def scrape(self) -> bool:
+        """Crawl the browse pages with a pool of fingerprinted sessions"""
         print("Starting Anime-Planet scrape with Rotating TLS...")
+        finished = False
+        try:
+            if self.mode == 'update' and self.checkpoint.get('crawled_at') and self.output_file.exists():
+                finished = self.scrape_updates()
+            else:
+                if self.mode == 'update':
+                    print("No finished full crawl to update from, running a full crawl\n")
+                finished = self.scrape_all()
+        except KeyboardInterrupt:
+            print("\n  [!] Scrape interrupted by user.")
+        
+        print(f"\n✓ Scrape complete. Total items in this run: {self.result_count}")
+        return finished
+    
+    def scrape_all(self) -> bool:
+        """Walk every browse page in the default (alphabetical) order"""
+        if not asyncio.run(self.scrape_pages('page', "", self.MAX_PAGES)):
+            return False
         
-        results = []
-        page = self.checkpoint.get("page", 1)
-        max_pages = 760 
+        # Start the next full crawl from the top; update mode can run from now on
+        self.checkpoint['page'] = 1
+        self.checkpoint['crawled_at'] = int(time.time())
+        self.save_checkpoint(self.checkpoint)
+        return True
+    
+    def scrape_updates(self) -> bool:
+        """
+        Re-crawl only the first pages of the newest-first listing
         
-        # Initialize first session
-        self.session = self.get_new_session()
+        New and airing entries sort to the front by year, so UPDATE_PAGES
+        pages cover them; they are merged by slug into the existing output.
+        """
+        self.merge_existing = True
+        print(f"Updating from the first {self.UPDATE_PAGES} pages sorted by {self.UPDATE_QUERY}\n")
         
-        consecutive_errors = 0
+        if not asyncio.run(self.scrape_pages('update_page', self.UPDATE_QUERY, self.UPDATE_PAGES)):
+            return False
         
-        while page <= max_pages:
-            try:
-                url = f"{self.BROWSE_URL}?page={page}"
-                print(f"  Page {page}/{max_pages} [{self.current_browser}]...", end="\r")
-                
-                # Request with timeout
-                try:
-                    response = self.session.get(url, timeout=30)
-                except Exception as e:
-                    print(f"\n  [!] Connection error: {e}")
-                    consecutive_errors += 1
-                    time.sleep(10)
-                    self.session = self.get_new_session()
+        self.checkpoint.pop('update_page', None)
+        self.save_checkpoint(self.checkpoint)
+        return True
+    
+    async def scrape_pages(self, page_key: str, query: str, max_pages: int) -> bool:
+        """
+        Hand pages to the session workers and write them back in page order
+        
+        Pages up to WINDOW ahead of the next one to write sit in a priority
+        queue (lowest page first). Each session runs its own worker: it waits
+        out its pacing or quarantine, takes the next page, and on a block puts
+        the page back for a healthy session. The checkpoint only moves past
+        pages that have been written, so a resumed run repeats nothing.
+        
+        Args:
+            page_key: Checkpoint key holding the next page to write
+            query: Extra browse parameters (see page_url)
+            max_pages: Last page to crawl
+        
+        Returns:
+            True if the listing was crawled to its end (or max_pages)
+        """
+        page = self.checkpoint.get(page_key, 1)
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        results: Dict[int, Optional[Dict[str, Any]]] = {}  # fetched pages waiting to be written
+        arrived = asyncio.Event()
+        state = {"stop_at": max_pages + 1, "failures": 0, "abort": None}
+        
+        async def worker(session: PooledSession):
+            while state["abort"] is None:
+                await session.wait_ready()
+                number = await queue.get()
+                if number >= state["stop_at"]:
                     continue
-
-                # --- HANDLING BLOCKS (403 / 429) ---
-                if response.status_code in [403, 429, 503]:
-                    consecutive_errors += 1
-                    wait_time = (random.randint(10, 30) * consecutive_errors)
-                    
-                    err_name = "Cloudflare Block" if response.status_code == 403 else "Rate Limit"
-                    print(f"\n  [!] {err_name} ({response.status_code}). Rotating ID & Sleeping {wait_time}s...")
-                    
-                    time.sleep(wait_time)
+                
+                outcome = await self.fetch_page(session, number, self.page_url(number, query))
+                if outcome == "retry":
+                    queue.put_nowait(number)
+                    state["failures"] += 1
+                    if state["failures"] > self.MAX_CONSECUTIVE_FAILURES:
+                        state["abort"] = "Too many consecutive blocks. Stopping to protect IP."
+                else:
+                    state["failures"] = 0
+                    results[number] = outcome
+                arrived.set()
+        
+        print(f"Starting from page {page} with {self.SESSIONS} sessions...")
+        
+        with SessionPool(self.SESSIONS, self.BROWSER_ROTATION, self.get_rate_limit(), self.PAGE_JITTER) as pool:
+            workers = [asyncio.create_task(worker(session)) for session in pool.sessions]
+            scheduled = page - 1   # highest page queued so far
+            try:
+                while page < state["stop_at"] and state["abort"] is None:
+                    # Write every page that is next in line
+                    while page in results and page < state["stop_at"]:
+                        if not self.write_page(page, results.pop(page), page_key, max_pages):
+                            state["stop_at"] = page + 1
+                        page += 1
                     
-                    # ROTATE FINGERPRINT
-                    self.session = self.get_new_session()
+                    # Keep a bounded window of pages queued
+                    while scheduled < min(page + self.WINDOW, state["stop_at"]) - 1:
+                        scheduled += 1
+                        queue.put_nowait(scheduled)
                     
-                    if consecutive_errors > 10:
-                        print("\n  [!] Too many consecutive blocks. Stopping to protect IP.")
+                    if page >= state["stop_at"]:
                         break
-                    
-                    # Retry the same page
-                    continue
-                
-                # Check for other non-200 errors
-                if response.status_code != 200:
-                    print(f"\n  [!] HTTP {response.status_code} - Skipping page")
-                    page += 1
-                    continue
-
-                # Reset error counter on success
-                consecutive_errors = 0
-                
-                # --- PARSING ---
-                soup = BeautifulSoup(response.content, 'html.parser')
-                cards = soup.select('li.card')
-                
-                if not cards:
-                    # Sometimes Cloudflare returns 200 but with a captcha page
-                    if "challenge" in soup.text.lower() or "cloudflare" in soup.text.lower():
-                        print("\n  [!] Soft Block (Captcha). Rotating ID...")
-                        self.session = self.get_new_session()
-                        time.sleep(15)
-                        continue
-                        
-                    print(f"\n  [!] No cards found on page {page}. Likely end of list.")
-                    break
-                
-                page_results = 0
-                for card in cards:
-                    try:
-                        processed = self.process_card(card)
-                        if processed:
-                            results.append(processed)
-                            page_results += 1
-                    except Exception:
-                        continue
-                
-                print(f"  Page {page}: Extracted {page_results} items ({self.current_browser})")
-                
-                # Save checkpoint
-                self.checkpoint['page'] = page + 1
-                self.save_checkpoint(self.checkpoint)
-                page += 1
-                
-                # Check next link
-                next_link = soup.select_one('li.next a')
-                if not next_link:
-                    print("\n  Reached last page.")
-                    break
-                    
-                # Jitter sleep
-                time.sleep(random.uniform(3.0, 7.0))
-
-            except KeyboardInterrupt:
-                print("\n  [!] Scrape interrupted by user.")
-                break
-            except Exception as e:
-                print(f"\n  [ERROR] Critical failure on page {page}: {e}")
-                break
-        
-        print(f"\n✓ Scrape complete. Total items in this run: {len(results)}")
-        return results
+                    arrived.clear()
+                    if page not in results:
+                        await arrived.wait()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+            
+            if state["abort"]:
+                print(f"\n  [!] {state['abort']}")
+            print(f"  Sessions: {pool.summary()}")
+        
+        return state["abort"] is None
     
-    def process_card(self, card: BeautifulSoup) -> Dict[str, Any]:
-        """Process an anime card element using the 'Tooltip' strategy"""
-        ap_id = card.get('data-id')
+    async def fetch_page(self, session: PooledSession, page: int, url: str) -> Union[str, Optional[Dict[str, Any]]]:
+        """
+        Fetch and parse one browse page through a session
         
-        link_tag = card.select_one('a.tooltip')
-        if not link_tag:
-            return None
-            
-        href = link_tag.get('href', '')
-        slug = href.replace('/anime/', '').strip('/')
+        Returns:
+            The parsed page, None to skip the page (non-retryable HTTP
+            error), or "retry" if the session was blocked or failed
+        """
+        try:
+            response = await session.get(url, timeout=30)
+        except Exception as e:
+            cooldown = session.record_error()
+            print(f"\n  [!] [{session.name}] Connection error on page {page}: {e}. Cooling down {cooldown:.0f}s")
+            return "retry"
         
-        tooltip_html = link_tag.get('title', '')
-        if not tooltip_html:
+        # --- HANDLING BLOCKS (403 / 429) ---
+        if response.status_code in [403, 429, 503]:
+            err_name = "Cloudflare Block" if response.status_code == 403 else "Rate Limit"
+            cooldown = session.record_block()
+            print(f"\n  [!] [{session.name}] {err_name} ({response.status_code}) on page {page}. "
+                  f"Quarantined {cooldown:.0f}s as {session.browser}")
+            return "retry"
+        
+        # Check for other non-200 errors
+        if response.status_code != 200:
+            print(f"\n  [!] HTTP {response.status_code} - Skipping page {page}")
+            session.record_success()
             return None
+        
+        # --- PARSING ---
+        parsed = self.parser.parse_page(response.content)
+        
+        # Sometimes Cloudflare returns 200 but with a captcha page
+        if parsed['blocked']:
+            cooldown = session.record_block()
+            print(f"\n  [!] [{session.name}] Soft Block (Captcha) on page {page}. Quarantined {cooldown:.0f}s")
+            return "retry"
+        
+        session.record_success()
+        parsed['session'] = f"{session.name} {session.browser}"
+        return parsed
+    
+    def write_page(self, page: int, parsed: Optional[Dict[str, Any]], page_key: str, max_pages: int) -> bool:
+        """
+        Save the cards of one page and checkpoint past it
+        
+        Returns:
+            True if more pages follow
+        """
+        if parsed is not None:
+            if parsed['empty']:
+                print(f"\n  [!] No cards found on page {page}. Likely end of list.")
+                return False
             
-        meta_soup = BeautifulSoup(tooltip_html, 'html.parser')
+            page_results = 0
+            for card in parsed['cards']:
+                try:
+                    processed = self.process_card(card)
+                    if processed:
+                        self.add_result(processed)
+                        page_results += 1
+                except Exception:
+                    continue
+            
+            print(f"  Page {page}/{max_pages}: Extracted {page_results} items ({parsed['session']})")
+        
+        # Save checkpoint
+        self.checkpoint[page_key] = page + 1
+        self.save_checkpoint(self.checkpoint)
         
-        title_tag = meta_soup.find('h5', class_='theme-font')
-        title = title_tag.get_text(strip=True) if title_tag else slug
+        # Check next link
+        if parsed is not None and not parsed['has_next']:
+            print("\n  Reached last page.")
+            return False
+        return True
+    
+    def process_card(self, card: Dict[str, Any]) -> Dict[str, Any]:
+        """Process the fields of one anime card (taken from its tooltip)"""
+        ap_id = card['ap_id']
+        href = card['href']
+        slug = href.replace('/anime/', '').strip('/')
+        
+        title = card['title'] or slug
         
         alt_title = None
-        alt_tag = meta_soup.find('h6', class_='tooltip-alt')
-        if alt_tag:
-            alt_text = alt_tag.get_text(strip=True)
-            if "Alt title:" in alt_text:
-                alt_title = alt_text.replace("Alt title:", "").strip()
-
+        alt_text = card['alt_title']
+        if alt_text and "Alt title:" in alt_text:
+            alt_title = alt_text.replace("Alt title:", "").strip()
+        
         item_type = "Unknown"
         episodes = None
-        type_tag = meta_soup.select_one('.entryBar .type')
-        if type_tag:
-            type_text = type_tag.get_text(strip=True)
+        type_text = card['type_text']
+        if type_text is not None:
             match = re.match(r'([^(]+)(?:\(([^)]+)\))?', type_text)
             if match:
                 item_type = match.group(1).strip()
@@ -191,27 +288,25 @@ class AnimePlanetScraper(BaseScraper):
                     ep_match = re.search(r'(\d+)', ep_text)
                     if ep_match:
                         episodes = int(ep_match.group(1))
-
+        
         year = None
-        year_tag = meta_soup.select_one('.entryBar .iconYear')
-        if year_tag:
-            year_text = year_tag.get_text(strip=True)
+        year_text = card['year_text']
+        if year_text is not None:
             if '-' in year_text:
                 year = year_text.split('-')[0].strip()
             else:
                 year = year_text.strip()
             if year.isdigit():
                 year = int(year)
-
-        tags = []
-        tag_list = meta_soup.select('.tags li')
-        for tag in tag_list:
-            tags.append(tag.get_text(strip=True))
-
+        
+        tags = card['tags']
+        
         external_ids = {
             'animeplanet': slug,
             'animeplanet_id': ap_id
         }
+        if self.offline_database:
+            self.offline_database.cross_ids('animeplanet', slug, external_ids)
         
         metadata = {
             "slug": slug,
@@ -221,7 +316,7 @@ class AnimePlanetScraper(BaseScraper):
             "year": year,
             "alt_title": alt_title,
             "tags": tags,
-            "image_url": card.select_one('img').get('data-src') if card.select_one('img') else None
+            "image_url": card['image_url']
         }
         
         return self.format_item(slug, title, item_type, external_ids, metadata)
@@ -6,7 +6,6 @@ from typing import Dict, List, Any
 import sys
 from pathlib import Path
 import gzip
-import csv
 import io
 
 # Add parent directory to path
@@ -29,7 +28,7 @@ class IMDBScraper(BaseScraper):
     def get_rate_limit(self) -> float:
         return 1.0
     
-    def scrape(self) -> List[Dict[str, Any]]:
+    def scrape(self) -> bool:
         """
         Scrape IMDB data from public datasets
         We'll download title.basics and filter for anime
@@ -38,79 +37,72 @@ class IMDBScraper(BaseScraper):
         print("This is a large file (~250MB compressed)")
         print("Download may take several minutes\n")
         
-        results = []
-        
         try:
             # Download the dataset
-            response = self.session.get(self.TITLE_BASICS_URL, stream=True)
+            response = self.session.get(self.TITLE_BASICS_URL, cache=True)
             
             if response.status_code != 200:
                 print(f"[!] Failed to download IMDB dataset: {response.status_code}")
-                return results
+                return False
             
-            print("✓ Downloaded successfully")
+            print("✓ Connected, streaming dataset")
             print("Processing dataset (this will take a while)...\n")
             
-            # Decompress and process line by line
-            with gzip.GzipFile(fileobj=io.BytesIO(response.content)) as gz:
-                # Read as text
-                text_content = gz.read().decode('utf-8')
+            # Decompress and parse while downloading, one line at a time
+            response.raw.decode_content = True
+            with gzip.GzipFile(fileobj=response.raw) as gz:
+                lines = io.TextIOWrapper(gz, encoding='utf-8', newline='\n')
                 
-                # Parse TSV
-                reader = csv.DictReader(
-                    io.StringIO(text_content),
-                    delimiter='\t',
-                    quoting=csv.QUOTE_NONE
-                )
+                # TSV without quoting, so a plain split matches csv.QUOTE_NONE
+                columns = lines.readline().rstrip('\n').split('\t')
+                genres_index = columns.index('genres')
+                type_index = columns.index('titleType')
                 
                 count = 0
                 anime_count = 0
                 
-                for row in reader:
+                for line in lines:
                     count += 1
                     
                     if count % 100000 == 0:
                         print(f"  Processed {count:,} titles, found {anime_count:,} anime...")
                     
+                    # Cheap prefilter on the raw line before splitting it
+                    if 'Animation' not in line:
+                        continue
+                    
+                    fields = line.rstrip('\n').split('\t')
+                    if len(fields) != len(columns):
+                        continue
+                    
                     # Filter for anime
                     # Look for Japanese titles with animation genre
-                    genres = row.get('genres', '')
+                    genres = fields[genres_index]
                     
                     if 'Animation' not in genres:
                         continue
                     
-                    # Check if it's likely anime (Japanese origin)
-                    original_title = row.get('originalTitle', '')
-                    title_type = row.get('titleType', '')
-                    
                     # Basic heuristic for anime
                     # This is imperfect but catches most anime
-                    is_anime = False
-                    
-                    # Check genres includes Animation
-                    if 'Animation' in genres:
-                        # Check if TV series or movie
-                        if title_type in ['tvSeries', 'tvMiniSeries', 'movie', 'tvSpecial']:
-                            is_anime = True
-                    
-                    if not is_anime:
+                    # Check if TV series or movie
+                    if fields[type_index] not in ['tvSeries', 'tvMiniSeries', 'movie', 'tvSpecial']:
                         continue
                     
                     try:
-                        processed = self.process_item(row)
+                        processed = self.process_item(dict(zip(columns, fields)))
                         if processed:
-                            results.append(processed)
+                            self.add_result(processed)
                             anime_count += 1
                     except Exception as e:
                         continue
             
             print(f"\n✓ Processed {count:,} total titles")
-            print(f"✓ Found {len(results):,} anime")
-            
+            print(f"✓ Found {self.result_count:,} anime")
+            return True
+        
         except Exception as e:
             print(f"[ERROR] Failed to process IMDB dataset: {e}")
-        
-        return results
+            return False
     
     def process_item(self, row: Dict[str, str]) -> Dict[str, Any]:
         """Process IMDB dataset row"""
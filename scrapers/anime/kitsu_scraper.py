@@ -2,136 +2,32 @@
 Kitsu scraper for anime
 File: scrapers/anime/kitsu_scraper.py
 """
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import sys
-import os
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from scrapers.base_scraper import BaseScraper
+from scrapers.kitsu_base import KitsuBaseScraper
 
-class KitsuAnimeScraper(BaseScraper):
+class KitsuAnimeScraper(KitsuBaseScraper):
     """Scraper for Kitsu API (anime)"""
     
     API_URL = "https://kitsu.io/api/edge/anime"
-    AUTH_URL = "https://kitsu.io/api/oauth/token"
     
-    def __init__(self):
-        # Initialize auth token as None before parent init
-        self.auth_header = {}
-        super().__init__("kitsu", "anime")
-        self._authenticate()
+    # Sparse fieldsets: only what process_item reads, plus the mapping links
+    FIELDS = (
+        "fields[anime]="
+        "canonicalTitle,titles,subtype,showType,status,episodeCount,"
+        "episodeLength,startDate,endDate,averageRating,userCount,favoritesCount,"
+        "popularityRank,ratingRank,ageRating,ageRatingGuide,nsfw,"
+        "mappings"
+        "&fields[mappings]=externalSite,externalId"
+    )
     
-    def _authenticate(self):
-        """Authenticate with Kitsu to access NSFW content"""
-        email = os.getenv("KITSU_EMAIL")
-        password = os.getenv("KITSU_PASSWORD")
-
-        if not email or not password:
-            print("  [WARN] KITSU_EMAIL or KITSU_PASSWORD not found. NSFW content will be hidden.")
-            return
-
-        try:
-            print("  Authenticating with Kitsu...")
-            response = self.session.post(
-                self.AUTH_URL,
-                json={
-                    "grant_type": "password",
-                    "username": email,
-                    "password": password
-                },
-                headers={"Content-Type": "application/json"}
-            )
-
-            if response.status_code == 200:
-                token = response.json().get("access_token")
-                self.auth_header = {"Authorization": f"Bearer {token}"}
-                print("  ✓ Authentication successful (NSFW content enabled)")
-            else:
-                print(f"  [!] Authentication failed (Status: {response.status_code}). Continuing as guest.")
-        except Exception as e:
-            print(f"  [!] Authentication error: {e}")
-
-    def get_rate_limit(self) -> float:
-        return 0.5
-    
-    def scrape(self) -> List[Dict[str, Any]]:
-        """Scrape Kitsu anime data"""
-        results = []
-        offset = self.checkpoint.get("offset", 0)
-        limit = 20
-        consecutive_errors = 0
-        max_consecutive_errors = 5
-        
-        print(f"Starting from offset {offset}...")
-        
-        while True:
-            try:
-                headers = {
-                    "Accept": "application/vnd.api+json",
-                    "Content-Type": "application/vnd.api+json"
-                }
-                headers.update(self.auth_header)
-
-                # Added &include=mappings to fetch external IDs in the same request
-                response = self.session.get(
-                    f"{self.API_URL}?page[limit]={limit}&page[offset]={offset}&include=mappings",
-                    headers=headers
-                )
-                
-                if response.status_code != 200:
-                    print(f"  [!] Error {response.status_code}. Stopping Kitsu scrape.")
-                    consecutive_errors += 1
-                    if consecutive_errors >= max_consecutive_errors:
-                        break
-                    continue
-                
-                consecutive_errors = 0
-                data = response.json()
-                items = data.get('data', [])
-                
-                # Create a lookup dict for mappings from the 'included' section
-                # Structure: { mapping_id: { externalSite, externalId } }
-                included = data.get('included', [])
-                mapping_lookup = {
-                    item['id']: item['attributes']
-                    for item in included
-                    if item.get('type') == 'mappings'
-                }
-                
-                if not items:
-                    print("  No more items found")
-                    break
-                
-                print(f"  Offset {offset} - {len(items)} items")
-                
-                for item in items:
-                    try:
-                        # Pass mapping_lookup to process_item
-                        processed = self.process_item(item, mapping_lookup)
-                        results.append(processed)
-                    except Exception as e:
-                        print(f"    [WARN] Failed to process item: {e}")
-                
-                self.checkpoint['offset'] = offset + limit
-                self.save_checkpoint(self.checkpoint)
-                
-                links = data.get('links', {})
-                if not links.get('next'):
-                    print("\n✓ Reached last page")
-                    break
-                
-                offset += limit
-                
-            except Exception as e:
-                print(f"  [ERROR] Offset {offset} failed: {e}")
-                consecutive_errors += 1
-                if consecutive_errors >= max_consecutive_errors:
-                    break
-        
-        return results
+    def __init__(self, shard: Optional[Tuple[int, int]] = None, shard_width: Optional[int] = None):
+        super().__init__("anime", shard, shard_width)
     
     def process_item(self, item: Dict[str, Any], mapping_lookup: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process Kitsu item"""
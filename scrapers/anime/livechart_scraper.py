@@ -2,43 +2,64 @@
 Livechart scraper - Complete database from 1907
 File: scrapers/anime/livechart_scraper.py
 """
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import sys
 from pathlib import Path
 from bs4 import BeautifulSoup
-import re
 import time
+from urllib.parse import urljoin
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from scrapers.base_scraper import BaseScraper
+from utils.id_extractor import extract_id_from_url, extract_ids_from_urls
+from utils.offline_database import get_offline_database
 
 class LivechartScraper(BaseScraper):
     """Scraper for Livechart.me - Complete database"""
     
     BASE_URL = "https://www.livechart.me"
+    SEASONS = ['winter', 'spring', 'summer', 'fall']
+    
+    # Seasons re-scraped around the current one in update mode
+    UPDATE_SEASONS_BEFORE = 2
+    UPDATE_SEASONS_AFTER = 2
     
     def __init__(self):
         super().__init__("livechart", "anime")
+        # Cross-references for the IDs the season cards don't link to
+        self.offline_database = get_offline_database(self.session)
     
     def get_rate_limit(self) -> float:
         return 2.0  # 2 seconds between requests
     
-    def scrape(self) -> List[Dict[str, Any]]:
+    def scrape(self) -> bool:
+        """Scrape Livechart (only the seasons around today in update mode)"""
+        if self.mode == 'update':
+            if self.checkpoint.get('crawled_at') and self.output_file.exists():
+                return self.scrape_updates()
+            print("No finished full crawl to update from, running a full crawl\n")
+        
+        return self.scrape_all()
+    
+    def scrape_all(self) -> bool:
         """
         Scrape Livechart's COMPLETE database
         Starting from winter-1907 to present
+        
+        Seasons that cannot be fetched are kept under "failed_seasons" in
+        the checkpoint and retried first on the next run.
+        
+        Returns:
+            True if every season was fetched
         """
         print("Scraping Livechart's COMPLETE database...")
         print("Starting from Winter 1907 to present")
         print("Note: Early seasons may be empty but we'll check them all\n")
         
-        results = []
-        
         # Generate ALL seasons from 1907 to 2027
         years = range(1907, 2028)
-        seasons_list = ['winter', 'spring', 'summer', 'fall']
         
         start_year = self.checkpoint.get("year", 1907)
         start_season = self.checkpoint.get("season", 'winter')
@@ -47,8 +68,14 @@ class LivechartScraper(BaseScraper):
         empty_count = 0
         max_empty = 20  # Stop after 20 consecutive empty seasons
         
+        # Seasons that failed in an earlier run go first
+        failed = []
+        for season, year in self.checkpoint.get('failed_seasons', []):
+            if self.scrape_season(season, year) is None:
+                failed.append([season, year])
+        
         for year in years:
-            for season in seasons_list:
+            for season in self.SEASONS:
                 # Skip until we reach checkpoint
                 if not started:
                     if year == start_year and season == start_season:
@@ -56,59 +83,133 @@ class LivechartScraper(BaseScraper):
                     else:
                         continue
                 
-                try:
-                    season_name = f"{season.capitalize()} {year}"
-                    
-                    url = f"{self.BASE_URL}/{season}-{year}/tv"
-                    response = self.session.get(url)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Find anime items
-                        items = soup.select('.anime-card, article.anime, .chart-item')
-                        
-                        if items:
-                            for item in items:
-                                try:
-                                    processed = self.process_item(item)
-                                    if processed:
-                                        results.append(processed)
-                                except Exception:
-                                    continue
-                            
-                            print(f"  {season_name}: {len(items)} items ✓")
-                            empty_count = 0  # Reset empty counter
-                        else:
-                            # Empty season
-                            empty_count += 1
-                            if year >= 2000:  # Only show for recent years
-                                print(f"  {season_name}: 0 items (empty)")
-                            
-                            # Stop if too many consecutive empty seasons (future seasons)
-                            if empty_count >= max_empty and year >= 2027:
-                                print(f"\n  Stopped after {max_empty} empty seasons")
-                                break
-                    
-                    # Save checkpoint
-                    self.checkpoint['year'] = year
-                    self.checkpoint['season'] = season
-                    self.save_checkpoint(self.checkpoint)
-                    
-                    # Small delay
-                    if len(results) % 100 == 0 and len(results) > 0:
-                        time.sleep(1)
+                count = self.scrape_season(season, year)
+                
+                if count is None:
+                    if [season, year] not in failed:
+                        failed.append([season, year])
+                elif count == 0:
+                    # Empty season
+                    empty_count += 1
                     
-                except Exception as e:
-                    print(f"  {season_name}: Failed - {e}")
-                    continue
+                    # Stop if too many consecutive empty seasons (future seasons)
+                    if empty_count >= max_empty and year >= 2027:
+                        print(f"\n  Stopped after {max_empty} empty seasons")
+                        break
+                elif count:
+                    empty_count = 0  # Reset empty counter
+                
+                # Save checkpoint
+                self.checkpoint['year'] = year
+                self.checkpoint['season'] = season
+                self.checkpoint['failed_seasons'] = failed
+                self.save_checkpoint(self.checkpoint)
+                
+                # Small delay
+                if self.result_count % 100 == 0 and self.result_count > 0:
+                    time.sleep(1)
             
             # Break if we hit too many empty seasons
             if empty_count >= max_empty and year >= 2027:
                 break
         
-        print(f"\n✓ Processed {len(results)} items from entire Livechart database")
-        return results
+        if failed:
+            self.checkpoint['failed_seasons'] = failed
+            self.save_checkpoint(self.checkpoint)
+            print(f"\n  [!] {len(failed)} seasons could not be fetched; rerun to retry them")
+            return False
+        
+        # Start the next full crawl from the beginning; update mode can run from now on
+        self.checkpoint['year'] = 1907
+        self.checkpoint['season'] = 'winter'
+        self.checkpoint.pop('failed_seasons', None)
+        self.checkpoint['crawled_at'] = int(time.time())
+        self.save_checkpoint(self.checkpoint)
+        
+        print(f"\n✓ Processed {self.result_count} items from entire Livechart database")
+        return True
+    
+    def scrape_updates(self) -> bool:
+        """
+        Re-scrape only the seasons around the current one
+        
+        New entries and changes land in airing and upcoming seasons, so
+        UPDATE_SEASONS_BEFORE/AFTER seasons around today are enough; the
+        items are merged by ID into the existing output.
+        
+        Returns:
+            True if every season was fetched
+        """
+        self.merge_existing = True
+        seasons = self.seasons_around(time.gmtime(), self.UPDATE_SEASONS_BEFORE, self.UPDATE_SEASONS_AFTER)
+        
+        print(f"Updating {len(seasons)} seasons around today...\n")
+        failed = [
+            f"{season.capitalize()} {year}"
+            for season, year in seasons
+            if self.scrape_season(season, year) is None
+        ]
+        
+        if failed:
+            print(f"\n  [!] Could not fetch {', '.join(failed)}; rerun to retry them")
+            return False
+        
+        print(f"\n✓ Processed {self.result_count} items from recent and upcoming seasons")
+        return True
+    
+    @classmethod
+    def seasons_around(cls, today: time.struct_time, before: int, after: int) -> List[Tuple[str, int]]:
+        """(season, year) pairs from before seasons ago to after seasons ahead of today's"""
+        current = today.tm_year * 4 + (today.tm_mon - 1) // 3
+        return [
+            (cls.SEASONS[index % 4], index // 4)
+            for index in range(current - before, current + after + 1)
+        ]
+    
+    def scrape_season(self, season: str, year: int) -> Optional[int]:
+        """
+        Scrape the TV chart of one season
+        
+        Returns:
+            Number of items found, or None if the season could not be fetched
+        """
+        season_name = f"{season.capitalize()} {year}"
+        
+        try:
+            url = f"{self.BASE_URL}/{season}-{year}/tv"
+            response = self.session.get(url)
+            
+            # A season Livechart has no chart for is empty, not a failure
+            if response.status_code == 404:
+                return 0
+            if response.status_code != 200:
+                print(f"  {season_name}: Failed - HTTP {response.status_code}")
+                return None
+            
+            soup = BeautifulSoup(response.content, 'html.parser')
+            
+            # Find anime items
+            items = soup.select('.anime-card, article.anime, .chart-item')
+            
+            if not items:
+                if year >= 2000:  # Only show for recent years
+                    print(f"  {season_name}: 0 items (empty)")
+                return 0
+            
+            for item in items:
+                try:
+                    processed = self.process_item(item)
+                    if processed:
+                        self.add_result(processed)
+                except Exception:
+                    continue
+            
+            print(f"  {season_name}: {len(items)} items ✓")
+            return len(items)
+        
+        except Exception as e:
+            print(f"  {season_name}: Failed - {e}")
+            return None
     
     def process_item(self, item: BeautifulSoup) -> Dict[str, Any]:
         """Process a Livechart anime item"""
@@ -120,12 +221,10 @@ class LivechartScraper(BaseScraper):
         href = link.get('href', '')
         
         # Extract ID from URL like /anime/12345
-        match = re.search(r'/anime/(\d+)', href)
-        if not match:
+        livechart_id = extract_id_from_url(urljoin(self.BASE_URL, href), 'livechart')
+        if not livechart_id:
             return None
         
-        livechart_id = match.group(1)
-        
         # Get title
         title_elem = item.select_one('h3, .anime-card__title, .main-title, .anime-name')
         title = title_elem.get_text(strip=True) if title_elem else f"Unknown {livechart_id}"
@@ -137,21 +236,11 @@ class LivechartScraper(BaseScraper):
         # External IDs
         external_ids = {'livechart': livechart_id}
         
-        # Try to extract MAL link if available
-        mal_link = item.select_one('a[href*="myanimelist.net"]')
-        if mal_link:
-            mal_href = mal_link.get('href', '')
-            mal_match = re.search(r'/anime/(\d+)', mal_href)
-            if mal_match:
-                external_ids['mal'] = mal_match.group(1)
-        
-        # Try to extract AniList link
-        anilist_link = item.select_one('a[href*="anilist.co"]')
-        if anilist_link:
-            al_href = anilist_link.get('href', '')
-            al_match = re.search(r'/anime/(\d+)', al_href)
-            if al_match:
-                external_ids['anilist'] = al_match.group(1)
+        # Try to extract MAL and AniList links if available
+        links = item.select('a[href*="myanimelist.net"], a[href*="anilist.co"]')
+        extract_ids_from_urls((a.get('href', '') for a in links), external_ids)
+        if self.offline_database:
+            self.offline_database.cross_ids('livechart', livechart_id, external_ids)
         
         # Metadata
         metadata = {
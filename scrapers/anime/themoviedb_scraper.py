@@ -2,21 +2,57 @@
 TMDB (The Movie Database) scraper for anime
 File: scrapers/anime/themoviedb_scraper.py
 """
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+import asyncio
+import gzip
+import io
+import json
 import sys
+import time
 from pathlib import Path
 import os
 import re
 
+import requests
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from scrapers.base_scraper import BaseScraper
+from utils.file_utils import load_json
+from utils.http_utils import AsyncRateLimitedSession
 
 class TMDBAnimeScraper(BaseScraper):
-    """Scraper for TMDB API (requires API key)"""
+    """
+    Scraper for TMDB API (requires API key)
+    
+    By default anime are found through the paged search and discover
+    listings. In bulk mode the daily TV series ID export is streamed
+    instead: shows whose original name contains Japanese characters are
+    looked up with /tv/{id}?append_to_response=external_ids and kept if
+    they are Japanese animation. Lookups are cached across runs, so a
+    daily bulk run only requests shows it has not seen before.
+    """
     
     API_URL = "https://api.themoviedb.org/3"
+    EXPORT_URL = "http://files.tmdb.org/p/exports/tv_series_ids_{date}.json.gz"
+    
+    # Lookups are done once per show and kept across runs;
+    # entries are refreshed after CACHE_MAX_AGE seconds
+    EXTERNAL_IDS_CACHE = Path("cache/tmdb/external_ids.json")
+    SHOWS_CACHE = Path("cache/tmdb/shows.json")
+    CACHE_MAX_AGE = 30 * 24 * 3600
+    ENRICH_CONCURRENCY = 8
+    EXPORT_CHUNK = 200  # export candidates resolved per checkpoint
+    
+    # Hiragana, katakana and CJK ideographs
+    JAPANESE_CHARS = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff]')
+    
+    # Show fields kept in the shows cache (what process_item reads)
+    SHOW_FIELDS = (
+        'id', 'name', 'original_name', 'overview', 'first_air_date', 'popularity',
+        'vote_average', 'vote_count', 'origin_country', 'original_language'
+    )
     
     def __init__(self):
         super().__init__("themoviedb", "anime")
@@ -25,63 +61,108 @@ class TMDBAnimeScraper(BaseScraper):
         if not self.api_key:
             print("[WARN] TMDB_API_KEY environment variable not set")
             print("[WARN] TMDB scraping will not work")
+        
+        self.external_ids_cache = self.load_cache(self.EXTERNAL_IDS_CACHE)
+        self.shows_cache = None  # loaded by bulk mode
     
     def get_rate_limit(self) -> float:
         return 0.25  # 4 requests per second allowed
     
-    def scrape(self) -> List[Dict[str, Any]]:
+    def get_rate_quotas(self) -> List[Tuple[int, float]]:
+        return [(40, 10)]  # ~40 per 10 seconds
+    
+    def scrape(self) -> bool:
         """Scrape TMDB anime data"""
         if not self.api_key:
             print("[!] Cannot scrape TMDB without API key")
             print("[!] Set TMDB_API_KEY environment variable")
-            return []
+            return False
         
+        if self.mode == 'bulk':
+            return asyncio.run(self.scrape_export())
+        return asyncio.run(self.scrape_listings())
+    
+    async def scrape_listings(self) -> bool:
+        """
+        Walk the search and discover listings, enriching each page's new shows
+        
+        Returns:
+            True if both listings were crawled to the end
+        """
         print("Scraping TMDB anime...")
-        results = []
         
-        # TMDB doesn't have an "anime" category directly
-        # We need to search for anime using keywords and genres
+        # Shows found by both approaches are only saved (and enriched) once
+        self.seen_ids = set()
         
-        # Approach 1: Search with "anime" keyword
-        results.extend(self.search_by_keyword("anime"))
+        async with AsyncRateLimitedSession(self.get_rate_limit(), self.ENRICH_CONCURRENCY,
+                                           self.get_rate_quotas()) as session:
+            # TMDB doesn't have an "anime" category directly
+            # We need to search for anime using keywords and genres
+            
+            # Approach 1: Search with "anime" keyword
+            searched = await self.search_by_keyword(session, "anime")
+            
+            # Approach 2: Discover with animation genre (ID: 16) and Japanese language
+            discovered = await self.discover_anime(session)
         
-        # Approach 2: Discover with animation genre (ID: 16) and Japanese language
-        results.extend(self.discover_anime())
+        print(f"\n✓ Total unique items: {len(self.seen_ids)}")
         
-        # Deduplicate
-        seen_ids = set()
-        unique_results = []
-        for item in results:
-            tmdb_id = item.get('id')
-            if tmdb_id and tmdb_id not in seen_ids:
-                seen_ids.add(tmdb_id)
-                unique_results.append(item)
+        if not (searched and discovered):
+            return False
         
-        print(f"\n✓ Total unique items: {len(unique_results)}")
-        return unique_results
+        # Start the next crawl of both listings from their first page
+        self.checkpoint.pop('search_page', None)
+        self.checkpoint.pop('discover_page', None)
+        self.save_checkpoint(self.checkpoint)
+        return True
     
-    def search_by_keyword(self, keyword: str) -> List[Dict[str, Any]]:
+    async def search_by_keyword(self, session: AsyncRateLimitedSession, keyword: str) -> bool:
         """Search TMDB by keyword"""
         print(f"\nSearching by keyword: '{keyword}'...")
-        results = []
         
-        page = self.checkpoint.get("search_page", 1)
-        max_pages = 100  # Limit search
+        return await self.crawl_pages(session, "search/tv", {
+            'query': keyword,
+            'language': 'en-US'
+        }, "search_page", max_pages=100)  # Limit search
+    
+    async def discover_anime(self, session: AsyncRateLimitedSession) -> bool:
+        """Discover anime using TMDB discover endpoint"""
+        print("\nDiscovering anime (Animation + Japanese)...")
+        
+        return await self.crawl_pages(session, "discover/tv", {
+            'with_genres': 16,  # Animation
+            'with_original_language': 'ja',  # Japanese
+            'sort_by': 'popularity.desc'
+        }, "discover_page", max_pages=500)
+    
+    async def crawl_pages(self, session: AsyncRateLimitedSession, endpoint: str,
+                          params: Dict[str, Any], page_key: str, max_pages: int) -> bool:
+        """
+        Walk a paged listing endpoint, checkpointing after each page
+        
+        Args:
+            session: Shared session
+            endpoint: Listing endpoint below API_URL
+            params: Query parameters besides api_key and page
+            page_key: Checkpoint key holding the next page
+            max_pages: Last page to fetch
+        
+        Returns:
+            True if the listing was crawled to its end (or max_pages),
+            False if a page failed
+        """
+        page = self.checkpoint.get(page_key, 1)
         
         while page <= max_pages:
             try:
-                url = f"{self.API_URL}/search/tv"
-                params = {
-                    'api_key': self.api_key,
-                    'query': keyword,
-                    'page': page,
-                    'language': 'en-US'
-                }
-                
-                response = self.session.get(url, params=params)
+                response = await session.get(
+                    f"{self.API_URL}/{endpoint}",
+                    params={**params, 'api_key': self.api_key, 'page': page}
+                )
                 
                 if response.status_code != 200:
-                    break
+                    print(f"    [!] Page {page}: HTTP {response.status_code}")
+                    return False
                 
                 data = response.json()
                 items = data.get('results', [])
@@ -91,86 +172,47 @@ class TMDBAnimeScraper(BaseScraper):
                 
                 print(f"  Page {page}/{data.get('total_pages', '?')} - {len(items)} items")
                 
-                for item in items:
-                    try:
-                        processed = self.process_item(item, 'tv')
-                        results.append(processed)
-                    except Exception as e:
-                        continue
+                await self.save_page(session, items)
                 
                 if page >= data.get('total_pages', 0):
                     break
                 
                 page += 1
-                self.checkpoint['search_page'] = page
+                self.checkpoint[page_key] = page
                 self.save_checkpoint(self.checkpoint)
-                
+            
             except Exception as e:
                 print(f"    [ERROR] Page {page} failed: {e}")
-                break
+                return False
         
-        return results
+        return True
     
-    def discover_anime(self) -> List[Dict[str, Any]]:
-        """Discover anime using TMDB discover endpoint"""
-        print("\nDiscovering anime (Animation + Japanese)...")
-        results = []
+    async def save_page(self, session: AsyncRateLimitedSession, items: List[Dict[str, Any]]):
+        """Save the shows of one listing page that were not saved yet this run"""
+        new_items = []
+        for item in items:
+            tmdb_id = item.get('id')
+            if tmdb_id and tmdb_id not in self.seen_ids:
+                self.seen_ids.add(tmdb_id)
+                new_items.append(item)
         
-        page = self.checkpoint.get("discover_page", 1)
-        max_pages = 500
+        external_ids = await self.resolve_external_ids(session, [item['id'] for item in new_items])
         
-        while page <= max_pages:
+        for item in new_items:
             try:
-                url = f"{self.API_URL}/discover/tv"
-                params = {
-                    'api_key': self.api_key,
-                    'with_genres': 16,  # Animation
-                    'with_original_language': 'ja',  # Japanese
-                    'page': page,
-                    'sort_by': 'popularity.desc'
-                }
-                
-                response = self.session.get(url, params=params)
-                
-                if response.status_code != 200:
-                    break
-                
-                data = response.json()
-                items = data.get('results', [])
-                
-                if not items:
-                    break
-                
-                print(f"  Page {page}/{data.get('total_pages', '?')} - {len(items)} items")
-                
-                for item in items:
-                    try:
-                        processed = self.process_item(item, 'tv')
-                        results.append(processed)
-                    except Exception as e:
-                        continue
-                
-                if page >= data.get('total_pages', 0):
-                    break
-                
-                page += 1
-                self.checkpoint['discover_page'] = page
-                self.save_checkpoint(self.checkpoint)
-                
+                processed = self.process_item(item, 'tv', external_ids.get(item['id'], {}))
+                self.add_result(processed)
             except Exception as e:
-                print(f"    [ERROR] Page {page} failed: {e}")
-                break
-        
-        return results
+                continue
     
-    def process_item(self, item: Dict[str, Any], media_type: str) -> Dict[str, Any]:
+    def process_item(self, item: Dict[str, Any], media_type: str,
+                     external_ids: Dict[str, str] = None) -> Dict[str, Any]:
         """Process TMDB item"""
         tmdb_id = item['id']
         title = item.get('name') or item.get('title', f"Unknown {tmdb_id}")
         item_type = media_type.upper()
         
-        # Get external IDs
-        external_ids = self.get_external_ids(tmdb_id, media_type)
+        external_ids = dict(external_ids or {})
         external_ids['themoviedb'] = str(tmdb_id)
         
         # Metadata
@@ -188,30 +230,305 @@ class TMDBAnimeScraper(BaseScraper):
         
         return self.format_item(tmdb_id, title, item_type, external_ids, metadata)
     
-    def get_external_ids(self, tmdb_id: int, media_type: str) -> Dict[str, str]:
-        """Get external IDs for a TMDB item"""
-        ids = {}
+    def load_cache(self, path: Path) -> Dict[str, Dict[str, Any]]:
+        """Load lookups made by earlier runs"""
+        if not path.exists():
+            return {}
+        try:
+            return load_json(path)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"  [WARN] Corrupted TMDB cache {path}, starting empty: {e}")
+            return {}
+    
+    def is_fresh(self, entry: Optional[Dict[str, Any]], now: float) -> bool:
+        """Whether a cache entry exists and is younger than CACHE_MAX_AGE"""
+        return entry is not None and now - entry.get('fetched', 0) < self.CACHE_MAX_AGE
+    
+    async def resolve_external_ids(self, session: AsyncRateLimitedSession,
+                                   tmdb_ids: List[int], media_type: str = 'tv') -> Dict[int, Dict[str, str]]:
+        """
+        External IDs of several shows, from the cache or fetched concurrently
+        
+        Args:
+            session: Shared session
+            tmdb_ids: Deduplicated TMDB IDs
+            media_type: 'tv' or 'movie'
+        
+        Returns:
+            Mapping of TMDB ID -> external IDs (empty if the lookup failed)
+        """
+        now = time.time()
+        resolved = {}
+        missing = []
+        for tmdb_id in tmdb_ids:
+            entry = self.external_ids_cache.get(str(tmdb_id))
+            if self.is_fresh(entry, now):
+                resolved[tmdb_id] = entry['ids']
+            else:
+                missing.append(tmdb_id)
+        
+        if not missing:
+            return resolved
         
+        fetched = await asyncio.gather(*(
+            self.get_external_ids(session, tmdb_id, media_type) for tmdb_id in missing
+        ))
+        for tmdb_id, ids in zip(missing, fetched):
+            if ids is None:
+                resolved[tmdb_id] = {}
+                continue
+            resolved[tmdb_id] = ids
+            self.external_ids_cache[str(tmdb_id)] = {'ids': ids, 'fetched': now}
+        
+        self._save_json(self.EXTERNAL_IDS_CACHE, self.external_ids_cache)
+        return resolved
+    
+    async def get_external_ids(self, session: AsyncRateLimitedSession, tmdb_id: int,
+                               media_type: str) -> Optional[Dict[str, str]]:
+        """
+        Get external IDs for a TMDB item
+        
+        Returns:
+            External IDs, or None if the request failed (not cached)
+        """
         try:
             url = f"{self.API_URL}/{media_type}/{tmdb_id}/external_ids"
             params = {'api_key': self.api_key}
             
-            response = self.session.get(url, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get('imdb_id'):
-                    ids['imdb'] = data['imdb_id']
-                
-                if data.get('tvdb_id'):
-                    ids['tvdb'] = str(data['tvdb_id'])
+            response = await session.get(url, params=params)
+            return self.parse_external_ids(response.json())
         
         except Exception as e:
-            pass
+            return None
+    
+    @staticmethod
+    def parse_external_ids(data: Dict[str, Any]) -> Dict[str, str]:
+        """Pick the IDs we map on from a TMDB external_ids object"""
+        ids = {}
+        
+        if data.get('imdb_id'):
+            ids['imdb'] = data['imdb_id']
+        
+        if data.get('tvdb_id'):
+            ids['tvdb'] = str(data['tvdb_id'])
         
         return ids
     
+    async def scrape_export(self) -> bool:
+        """
+        Ingest the daily TV series ID export, looking up only shows not cached yet
+        
+        Candidates whose lookup failed (and that have no cached entry to fall
+        back on) are queued under "export_retry" in the checkpoint together
+        with the index that moves past them, and are looked up again once the
+        export has been walked.
+        
+        Returns:
+            False if the export could not be read or lookups are still failing
+        """
+        print("Scraping TMDB anime from the daily ID export...")
+        
+        self.shows_cache = self.load_cache(self.SHOWS_CACHE)
+        
+        # Stay on the export a resumed run started with
+        export_date = self.checkpoint.get('export_date')
+        candidates, export_date = self.load_export_candidates(export_date)
+        if candidates is None:
+            return False
+        
+        if export_date != self.checkpoint.get('export_date'):
+            self.checkpoint['export_date'] = export_date
+            self.checkpoint['export_index'] = 0
+            self.checkpoint['export_retry'] = []
+        index = self.checkpoint.get('export_index', 0)
+        retry = self.checkpoint.get('export_retry', [])
+        
+        print(f"\n{len(candidates):,} candidates with Japanese original names, starting at {index:,}")
+        
+        async with AsyncRateLimitedSession(self.get_rate_limit(), self.ENRICH_CONCURRENCY,
+                                           self.get_rate_quotas()) as session:
+            while index < len(candidates):
+                chunk = candidates[index:index + self.EXPORT_CHUNK]
+                failed = await self.add_shows(session, chunk)
+                
+                index += len(chunk)
+                print(f"  {index:,}/{len(candidates):,} candidates - {self.result_count:,} anime "
+                      f"({len(failed)} lookups failed)")
+                
+                retry.extend(failed)
+                self.checkpoint['export_index'] = index
+                self.checkpoint['export_retry'] = retry
+                self.save_checkpoint(self.checkpoint)
+            
+            if retry:
+                print(f"\nRetrying {len(retry):,} failed lookups...")
+                retry = await self.add_shows(session, retry)
+                self.checkpoint['export_retry'] = retry
+                self.save_checkpoint(self.checkpoint)
+        
+        if retry:
+            print(f"[!] {len(retry):,} shows could not be looked up; rerun to retry them")
+            return False
+        
+        self.checkpoint.pop('export_date', None)
+        self.checkpoint.pop('export_index', None)
+        self.checkpoint.pop('export_retry', None)
+        self.save_checkpoint(self.checkpoint)
+        return True
+    
+    async def add_shows(self, session: AsyncRateLimitedSession, tmdb_ids: List[int]) -> List[int]:
+        """
+        Add the anime among export candidates to the results
+        
+        Returns:
+            Candidates that could not be looked up and have no cached entry
+        """
+        shows, failed = await self.resolve_shows(session, tmdb_ids)
+        
+        for show in shows:
+            try:
+                external_ids = self.external_ids_cache.get(str(show['id']), {}).get('ids', {})
+                processed = self.process_item(show, 'tv', external_ids)
+                self.add_result(processed)
+            except Exception as e:
+                continue
+        return failed
+    
+    def load_export_candidates(self, export_date: Optional[str] = None) -> Tuple[Optional[List[int]], Optional[str]]:
+        """
+        Stream the gzipped JSONL ID export and keep shows with Japanese original names
+        
+        Args:
+            export_date: MM_DD_YYYY of the export to read; by default the
+                newest one (today's is only published during the day)
+        
+        Returns:
+            (Candidate TMDB IDs, export date), or (None, None) if no export
+            could be downloaded
+        """
+        if export_date:
+            dates = [export_date]
+        else:
+            now = time.time()
+            dates = [time.strftime('%m_%d_%Y', time.gmtime(now - days * 86400)) for days in range(3)]
+        
+        for date in dates:
+            url = self.EXPORT_URL.format(date=date)
+            try:
+                response = self.session.get(url, stream=True)
+            except Exception as e:
+                continue
+            
+            print(f"✓ Streaming {url}")
+            candidates = []
+            
+            # Decompress and parse while downloading, one line at a time
+            try:
+                response.raw.decode_content = True
+                with gzip.GzipFile(fileobj=response.raw) as gz:
+                    for line in io.TextIOWrapper(gz, encoding='utf-8'):
+                        # Cheap prefilter: Japanese names need non-ASCII (or escaped) text
+                        if line.isascii() and '\\u' not in line:
+                            continue
+                        
+                        try:
+                            show = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        
+                        if show.get('adult') or not self.JAPANESE_CHARS.search(show.get('original_name') or ''):
+                            continue
+                        candidates.append(show['id'])
+            except Exception as e:
+                # Truncated or corrupt download (EOFError, BadGzipFile, dropped connection)
+                print(f"[!] Export {date} could not be read: {e}")
+                continue
+            finally:
+                response.close()
+            
+            return candidates, date
+        
+        print("[!] No TMDB ID export available")
+        return None, None
+    
+    @staticmethod
+    def is_anime(show: Dict[str, Any]) -> bool:
+        """Animation genre and Japanese origin, as in discover_anime"""
+        genres = {genre.get('id') for genre in show.get('genres', [])}
+        japanese = show.get('original_language') == 'ja' or 'JP' in (show.get('origin_country') or [])
+        return 16 in genres and japanese
+    
+    async def resolve_shows(self, session: AsyncRateLimitedSession,
+                            tmdb_ids: List[int]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Anime among export candidates, from the cache or looked up concurrently
+        
+        Args:
+            session: Shared session
+            tmdb_ids: Candidate TMDB IDs
+        
+        Returns:
+            (Anime shows in candidate order, candidates whose lookup failed
+            and that have no cached entry); a failed lookup with a stale
+            cache entry falls back on that entry
+        """
+        now = time.time()
+        missing = [tmdb_id for tmdb_id in tmdb_ids
+                   if not self.is_fresh(self.shows_cache.get(str(tmdb_id)), now)]
+        failed = []
+        
+        if missing:
+            fetched = await asyncio.gather(*(self.get_show(session, tmdb_id) for tmdb_id in missing))
+            for tmdb_id, show in zip(missing, fetched):
+                if show is None:
+                    if str(tmdb_id) not in self.shows_cache:
+                        failed.append(tmdb_id)
+                    continue
+                
+                self.external_ids_cache[str(tmdb_id)] = {
+                    'ids': self.parse_external_ids(show.get('external_ids') or {}),
+                    'fetched': now
+                }
+                if self.is_anime(show):
+                    entry = {'anime': True, 'show': {key: show.get(key) for key in self.SHOW_FIELDS}}
+                else:
+                    entry = {'anime': False}
+                entry['fetched'] = now
+                self.shows_cache[str(tmdb_id)] = entry
+            
+            self._save_json(self.SHOWS_CACHE, self.shows_cache)
+            self._save_json(self.EXTERNAL_IDS_CACHE, self.external_ids_cache)
+        
+        shows = []
+        for tmdb_id in tmdb_ids:
+            entry = self.shows_cache.get(str(tmdb_id))
+            if entry and entry['anime']:
+                shows.append(entry['show'])
+        return shows, failed
+    
+    async def get_show(self, session: AsyncRateLimitedSession, tmdb_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a show's details together with its external IDs
+        
+        Returns:
+            Show details ({} if the show no longer exists), or None if the
+            request failed
+        """
+        try:
+            url = f"{self.API_URL}/tv/{tmdb_id}"
+            params = {'api_key': self.api_key, 'append_to_response': 'external_ids'}
+            
+            response = await session.get(url, params=params)
+            return response.json()
+        
+        except requests.HTTPError as e:
+            # Deleted since the export was made; cached as not anime
+            if e.response is not None and e.response.status_code == 404:
+                return {}
+            return None
+        except Exception as e:
+            return None
+    
     def extract_external_ids(self, item: Dict[str, Any]) -> Dict[str, str]:
         """Extract external IDs"""
         # Done in process_item
@@ -55,21 +55,20 @@ class TVDBScraper(BaseScraper):
         
         return False
     
-    def scrape(self) -> List[Dict[str, Any]]:
+    def scrape(self) -> bool:
         """Scrape TVDB anime data"""
         if not self.api_key:
             print("[!] Cannot scrape TVDB without API key")
             print("[!] Set TVDB_API_KEY environment variable")
-            return []
+            return False
         
         if not self.authenticate():
             print("[!] Failed to authenticate with TVDB")
-            return []
+            return False
         
         print("Scraping TVDB anime...")
         print("Note: Filtering by Japanese language\n")
         
-        results = []
         page = self.checkpoint.get("page", 0)
         
         while True:
@@ -85,7 +84,7 @@ class TVDBScraper(BaseScraper):
                 
                 if response.status_code != 200:
                     print(f"  [!] HTTP {response.status_code}")
-                    break
+                    return False
                 
                 data = response.json()
                 items = data.get('data', [])
@@ -100,7 +99,7 @@ class TVDBScraper(BaseScraper):
                     try:
                         processed = self.process_item(item)
                         if processed:
-                            results.append(processed)
+                            self.add_result(processed)
                     except Exception as e:
                         continue
                 
@@ -115,13 +114,17 @@ class TVDBScraper(BaseScraper):
                     break
                 
                 page += 1
-                
+            
             except Exception as e:
                 print(f"  [ERROR] Page {page} failed: {e}")
-                break
+                return False
+        
+        print(f"\n✓ Processed {self.result_count} items")
         
-        print(f"\n✓ Processed {len(results)} items")
-        return results
+        # Start the next crawl from the first page
+        self.checkpoint['page'] = 0
+        self.save_checkpoint(self.checkpoint)
+        return True
     
     def process_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """Process TVDB item"""
@@ -5,7 +5,7 @@ File: scrapers/base_scraper.py
 import json
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from abc import ABC, abstractmethod
 
 class BaseScraper(ABC):
@@ -22,11 +22,18 @@ class BaseScraper(ABC):
         self.service_name = service_name
         self.media_type = media_type
         
+        # 'full', 'update' or 'bulk' (set by run); in update mode scrapers
+        # that support it fetch only changes and set merge_existing
+        self.mode = 'full'
+        self.merge_existing = False
+        
         # Import here to avoid circular imports
         from utils.http_utils import RateLimitedSession
-        from utils.file_utils import save_json
+        from utils.http_cache import HttpCache
+        from utils.file_utils import save_json, JsonlSink
         
-        self.session = RateLimitedSession(self.get_rate_limit())
+        # Requests made with cache=True revalidate against cache/http
+        self.session = RateLimitedSession(self.get_rate_limit(), self.get_rate_quotas(), HttpCache())
         self._save_json = save_json
         
         # Setup paths
@@ -38,12 +45,14 @@ class BaseScraper(ABC):
         
         self.output_file = self.output_dir / f"{service_name}-{media_type}.json"
         self.checkpoint_file = self.checkpoint_dir / f"{service_name}-checkpoint.json"
+        self.results_file = self.checkpoint_dir / f"{service_name}-results.jsonl"
         
         # Load checkpoint (with error handling)
         self.checkpoint = self.load_checkpoint()
         
-        # Results storage
-        self.results: List[Dict[str, Any]] = []
+        # Results are streamed to an append-only JSONL log while scraping
+        # and compacted into output_file when the run finishes
+        self.result_sink = JsonlSink(self.results_file)
         
         print(f"\n{'='*70}")
         print(f"Initializing {service_name.upper()} scraper for {media_type}")
@@ -60,13 +69,30 @@ class BaseScraper(ABC):
         """
         pass
     
+    def get_rate_quotas(self) -> Optional[List[Tuple[int, float]]]:
+        """
+        Return the service's published request quotas, if known
+        
+        Override to pace requests with a token bucket shared per host
+        instead of the fixed get_rate_limit gap.
+        
+        Returns:
+            List of (max requests, window seconds) pairs, or None
+        """
+        return None
+    
     @abstractmethod
-    def scrape(self) -> List[Dict[str, Any]]:
+    def scrape(self):
         """
         Main scraping logic - must be implemented by each scraper
         
+        Each scraped item (in standardized format) is passed to
+        add_result as soon as it is ready instead of being collected.
+        
         Returns:
-            List of scraped items in standardized format
+            False if the scrape stopped before the end (e.g. on a failed
+            page); its cursor and results log are then kept so the next run
+            resumes. Anything else means it finished and the cursor was reset.
         """
         pass
     
@@ -77,12 +103,22 @@ class BaseScraper(ABC):
         
         Args:
             item: Raw item data from service
-            
+        
         Returns:
             Dictionary mapping service names to IDs
         """
         pass
     
+    def default_checkpoint(self) -> Dict[str, Any]:
+        """Checkpoint used when starting from scratch"""
+        return {
+            "last_id": 0,
+            "page": 1,
+            "offset": 0,
+            "results_offset": 0,
+            "last_updated": None
+        }
+    
     def load_checkpoint(self) -> Dict[str, Any]:
         """
         Load scraping checkpoint with error handling
@@ -90,12 +126,7 @@ class BaseScraper(ABC):
         Returns:
             Checkpoint data dictionary
         """
-        default_checkpoint = {
-            "last_id": 0,
-            "page": 1,
-            "offset": 0,
-            "last_updated": None
-        }
+        default_checkpoint = self.default_checkpoint()
         
         if not self.checkpoint_file.exists():
             return default_checkpoint
@@ -110,7 +141,7 @@ class BaseScraper(ABC):
                 return default_checkpoint
             
             return checkpoint
-            
+        
         except (json.JSONDecodeError, Exception) as e:
             print(f"[WARN] Corrupted checkpoint file, starting fresh: {e}")
             # Delete corrupted checkpoint
@@ -124,16 +155,79 @@ class BaseScraper(ABC):
         """
         Save scraping checkpoint
         
+        The results log is synced first and its size is stored with the
+        cursor, so the checkpoint always describes exactly which items the
+        cursor has already covered. The checkpoint file itself is replaced
+        atomically (write temp, then rename).
+        
         Args:
             data: Checkpoint data to save
         """
+        self._write_checkpoint(data, self.result_sink.commit())
+    
+    def _write_checkpoint(self, data: Dict[str, Any], results_offset: int):
+        """Atomically write a checkpoint that commits the log up to results_offset"""
+        data["results_offset"] = results_offset
         data["last_updated"] = time.strftime("%Y-%m-%d %H:%M:%S")
         self._save_json(self.checkpoint_file, data)
     
+    def open_results(self):
+        """
+        Open the results log, rolled back to the last committed checkpoint
+        
+        Items written after the last checkpoint are dropped: the cursor
+        stored in the checkpoint will scrape them again. If the log is
+        shorter than the checkpoint says (e.g. it was lost), the items the
+        cursor skips over are gone, so the scrape restarts from scratch.
+        """
+        committed = self.checkpoint.get("results_offset", 0)
+        
+        if self.result_sink.size() < committed:
+            print(f"[WARN] Results log is missing items committed by the checkpoint, starting fresh")
+            self.checkpoint = self.default_checkpoint()
+            committed = 0
+        
+        self.result_sink.open(resume=True, offset=committed)
+        if self.result_count:
+            print(f"Resuming with {self.result_count} items from an unfinished run")
+    
+    def add_result(self, item: Dict[str, Any]):
+        """
+        Append a scraped item to the results log
+        
+        Args:
+            item: Item in standardized format (see format_item)
+        """
+        self.result_sink.write(item)
+    
+    @property
+    def result_count(self) -> int:
+        """Number of items in the results log (including resumed ones)"""
+        return self.result_sink.count
+    
     def save_results(self):
-        """Save scraped results to file"""
-        self._save_json(self.output_file, self.results)
-        print(f"\n✓ Saved {len(self.results)} items to {self.output_file}")
+        """
+        Compact the results log into the final JSON output file
+        
+        With merge_existing set, items already in the output file are kept
+        unless the log has a newer item with the same ID.
+        """
+        base = self.output_file if self.merge_existing else None
+        saved = self.result_sink.compact(self.output_file, base_path=base)
+        print(f"\n✓ Saved {saved} items to {self.output_file}")
+    
+    def save_partial_results(self):
+        """
+        Save the items of an unfinished run without shrinking the output
+        
+        The results log stays behind for the next run, which resumes with it
+        and writes the complete output. Until then the items are merged into
+        the existing output file instead of replacing it.
+        """
+        if not self.result_count:
+            return
+        self.merge_existing = True
+        self.save_results()
     
     def format_item(self, item_id: str, title: str, item_type: str, 
                    external_ids: Dict[str, str], metadata: Dict[str, Any]) -> Dict[str, Any]:
@@ -146,7 +240,7 @@ class BaseScraper(ABC):
             item_type: Type (TV, Movie, OVA, etc.)
             external_ids: Dictionary of external service IDs
             metadata: Additional metadata from service
-            
+        
         Returns:
             Standardized item dictionary
         """
@@ -158,32 +252,55 @@ class BaseScraper(ABC):
             "metadata": metadata
         }
     
-    def run(self):
-        """Execute the scraping process"""
+    def run(self, mode: str = 'full'):
+        """
+        Execute the scraping process
+        
+        Args:
+            mode: 'full' to scrape everything, 'update' to let scrapers that
+                support it fetch only what changed since the last run
+                ('bulk' makes TMDB ingest its daily ID export)
+        """
+        self.mode = mode
+        
         try:
             print(f"Starting scrape for {self.service_name}...")
             start_time = time.time()
             
-            self.results = self.scrape()
+            # A leftover log means the previous run did not finish; keep its committed items
+            self.open_results()
+            
+            if self.scrape() is False:
+                print(f"\n[!] {self.service_name.upper()} stopped before the end, rerun to resume")
+                print(f"Saving {self.result_count} items collected so far...")
+                self.save_partial_results()
+                self.result_sink.close()
+                return
+            
             self.save_results()
             
+            # Items are in the output file now; commit an empty log before deleting it
+            self.result_sink.close()
+            self._write_checkpoint(self.checkpoint, 0)
+            self.result_sink.remove()
+            
             elapsed = time.time() - start_time
             print(f"\n{'='*70}")
             print(f"{self.service_name.upper()} scraping complete!")
-            print(f"Total items: {len(self.results)}")
+            print(f"Total items: {self.result_count}")
             print(f"Time elapsed: {elapsed:.2f} seconds")
             print(f"{'='*70}\n")
-            
+        
         except KeyboardInterrupt:
             print(f"\n\n[!] Scraping interrupted by user")
-            print(f"Saving {len(self.results)} items collected so far...")
-            if self.results:
-                self.save_results()
+            print(f"Saving {self.result_count} items collected so far...")
+            self.save_partial_results()
+            self.result_sink.close()
             raise
-            
+        
         except Exception as e:
             print(f"\n[ERROR] Scraping failed: {e}")
-            print(f"Saving {len(self.results)} items collected before error...")
-            if self.results:
-                self.save_results()
+            print(f"Saving {self.result_count} items collected before error...")
+            self.save_partial_results()
+            self.result_sink.close()
             raise
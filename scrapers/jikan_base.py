@@ -0,0 +1,169 @@
+"""
+Shared concurrent Jikan (MyAnimeList) page fetching for the anime and manga scrapers
+File: scrapers/jikan_base.py
+"""
+from typing import Dict, List, Any, Optional, Tuple
+from abc import abstractmethod
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scrapers.base_scraper import BaseScraper
+from utils.http_utils import AsyncRateLimitedSession
+
+class JikanBaseScraper(BaseScraper):
+    """
+    Base class for Jikan scrapers
+    
+    Pages are fetched by a small pool of concurrent requests that share
+    the api.jikan.moe token bucket (3/s and 60/min). The total comes from
+    pagination.last_visible_page of the first page. Responses may arrive
+    out of order; they are held back and written strictly in page order,
+    with a checkpoint after every page.
+    
+    Subclasses set API_URL and implement process_item.
+    """
+    
+    API_URL = ""
+    
+    WORKERS = 3        # requests in flight
+    WINDOW = 12        # how far ahead of the next page to write we fetch
+    MAX_ATTEMPTS = 5   # tries per page before giving up
+    
+    def get_rate_limit(self) -> float:
+        return 1.0  # Jikan has strict rate limits
+    
+    def get_rate_quotas(self) -> List[Tuple[int, float]]:
+        return [(3, 1), (60, 60)]  # Jikan: 3/s and 60/min
+    
+    def scrape(self) -> bool:
+        """Scrape MAL data via Jikan"""
+        if not asyncio.run(self.scrape_pages()):
+            return False
+        
+        # Start the next crawl from the first page
+        self.checkpoint['page'] = 1
+        self.save_checkpoint(self.checkpoint)
+        return True
+    
+    async def fetch_page(self, session: AsyncRateLimitedSession, page: int) -> Optional[Dict[str, Any]]:
+        """
+        Fetch one page, retrying on errors
+        
+        Returns:
+            Parsed response, or None if every attempt failed
+        """
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            try:
+                response = await session.get(f"{self.API_URL}?page={page}&limit=25")
+                return response.json()
+            except Exception as e:
+                print(f"  [ERROR] Page {page} failed (attempt {attempt}/{self.MAX_ATTEMPTS}): {e}")
+                if attempt < self.MAX_ATTEMPTS:
+                    await asyncio.sleep(10)
+        return None
+    
+    def write_page(self, page: int, data: Dict[str, Any]) -> bool:
+        """
+        Save the items of one page and checkpoint past it
+        
+        Returns:
+            True if more pages follow
+        """
+        items = data.get('data')
+        if not items:
+            print("  No more items found")
+            return False
+        
+        pagination = data.get('pagination', {})
+        current = pagination.get('current_page', page)
+        last = pagination.get('last_visible_page', '?')
+        print(f"  Page {current}/{last} - {len(items)} items")
+        
+        for item in items:
+            try:
+                processed = self.process_item(item)
+                self.add_result(processed)
+            except Exception as e:
+                print(f"    [WARN] Failed to process item: {e}")
+        
+        # Save checkpoint
+        self.checkpoint['page'] = page + 1
+        self.save_checkpoint(self.checkpoint)
+        
+        if not pagination.get('has_next_page'):
+            print("\n✓ Reached last page")
+            return False
+        return True
+    
+    async def scrape_pages(self) -> bool:
+        """
+        Fetch pages concurrently and write them back in order
+        
+        Returns:
+            True if the last page was written, False if a page before it failed
+        """
+        page = self.checkpoint.get("page", 1)
+        
+        print(f"Starting from page {page} with {self.WORKERS} concurrent requests...")
+        print("Note: Jikan API has strict rate limits. This may take a while.\n")
+        
+        async with AsyncRateLimitedSession(self.get_rate_limit(), self.WORKERS, self.get_rate_quotas()) as session:
+            first = await self.fetch_page(session, page)
+            if first is None:
+                return False
+            
+            last = first.get('pagination', {}).get('last_visible_page') or page
+            results = {page: first}   # fetched pages waiting to be written
+            tasks: Dict[int, asyncio.Task] = {}
+            next_page = page          # next page to write
+            scheduled = page          # highest page requested so far
+            stop_at = None            # first page that must not be written
+            reached_end = False       # a page said it was the last one
+            
+            try:
+                while True:
+                    # Write every page that is next in line
+                    while next_page in results and (stop_at is None or next_page < stop_at):
+                        data = results.pop(next_page)
+                        last = max(last, data.get('pagination', {}).get('last_visible_page') or 0)
+                        if not self.write_page(next_page, data):
+                            stop_at = next_page + 1
+                            reached_end = True
+                        next_page += 1
+                    
+                    if stop_at is not None and next_page >= stop_at:
+                        break
+                    
+                    # Keep a bounded window of pages in flight
+                    limit = max(min(last, next_page + self.WINDOW - 1), next_page)
+                    if stop_at is not None:
+                        limit = min(limit, stop_at - 1)
+                    while scheduled < limit:
+                        scheduled += 1
+                        tasks[scheduled] = asyncio.create_task(self.fetch_page(session, scheduled))
+                    
+                    done, _ = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_COMPLETED)
+                    for number in [number for number, task in tasks.items() if task in done]:
+                        data = tasks.pop(number).result()
+                        if data is None:
+                            # Pages before the failed one can still be written
+                            print(f"  [!] Giving up at page {number}")
+                            stop_at = number if stop_at is None else min(stop_at, number)
+                        else:
+                            results[number] = data
+            
+            finally:
+                for task in tasks.values():
+                    task.cancel()
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+        
+        return reached_end
+    
+    @abstractmethod
+    def process_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert one Jikan item to the standardized item format"""
+        pass
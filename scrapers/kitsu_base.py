@@ -0,0 +1,381 @@
+"""
+Shared sharded Kitsu crawling for the anime and manga scrapers
+File: scrapers/kitsu_base.py
+"""
+from typing import Dict, List, Any, Optional, Tuple
+from abc import abstractmethod
+import asyncio
+import math
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scrapers.base_scraper import BaseScraper
+from utils.file_utils import JsonlSink, load_json, save_json
+from utils.http_utils import AsyncRateLimitedSession
+
+class KitsuBaseScraper(BaseScraper):
+    """
+    Base class for Kitsu scrapers
+    
+    The ID space is split into contiguous ranges of shard_width IDs, the
+    last one open-ended. Each shard is crawled by its own worker in windows
+    of PAGE_LIMIT consecutive IDs, requested as an explicit filter[id] list
+    (Kitsu's id filter takes comma lists, not ranges), so entries deleted or
+    added mid-crawl never shift other entries across a shard or page
+    boundary. Each shard streams its items to its own log and keeps its own
+    cursor under "shards" in the checkpoint. When every shard is done the
+    logs are merged in shard order, so the output does not depend on which
+    worker finished first.
+    
+    With shard=(i, n) only shard i of n is crawled and the output goes to
+    kitsu-<media>.shard-<i>-of-<n>.json, so a CI matrix can run one shard
+    per job and combine them with merge_shard_outputs. The jobs must agree
+    on the boundaries, so the width is planned once (plan_shard_width) and
+    passed to every job as shard_width.
+    
+    Subclasses set API_URL and FIELDS and implement process_item.
+    """
+    
+    API_URL = ""
+    AUTH_URL = "https://kitsu.io/api/oauth/token"
+    FIELDS = ""  # sparse fieldset query parameters
+    
+    PAGE_LIMIT = 20     # Kitsu's maximum page size
+    SHARDS = 4          # workers when crawling every shard in one process
+    SHARD_ALIGN = 1000  # shard widths are rounded up to this many IDs
+    MAX_CONSECUTIVE_ERRORS = 5
+    
+    def __init__(self, media_type: str, shard: Optional[Tuple[int, int]] = None,
+                 shard_width: Optional[int] = None):
+        """
+        Initialize Kitsu scraper
+        
+        Args:
+            media_type: 'anime' or 'manga'
+            shard: (index, count) to crawl only one shard, 1-based
+            shard_width: IDs per shard, as planned by plan_shard_width
+                (default: planned from the current highest ID)
+        """
+        # Initialize auth token as None before parent init
+        self.auth_header = {}
+        self.shard = shard
+        self.shard_width = shard_width
+        super().__init__("kitsu", media_type)
+        
+        if shard:
+            index, count = shard
+            self.output_file = self.shard_output_file(self.output_dir, media_type, index, count)
+            print(f"Crawling shard {index}/{count} -> {self.output_file}\n")
+            if shard_width is None:
+                print("  [WARN] No shard width given; jobs planning their own width may disagree on the boundaries\n")
+        
+        self._authenticate()
+    
+    @staticmethod
+    def shard_output_file(output_dir: Path, media_type: str, index: int, count: int) -> Path:
+        """Output file of one shard crawled on its own"""
+        return Path(output_dir) / f"kitsu-{media_type}.shard-{index}-of-{count}.json"
+    
+    def _authenticate(self):
+        """Authenticate with Kitsu to access NSFW content"""
+        email = os.getenv("KITSU_EMAIL")
+        password = os.getenv("KITSU_PASSWORD")
+        
+        if not email or not password:
+            print("  [WARN] KITSU_EMAIL or KITSU_PASSWORD not found. NSFW content will be hidden.")
+            return
+        
+        try:
+            print("  Authenticating with Kitsu...")
+            response = self.session.post(
+                self.AUTH_URL,
+                json={
+                    "grant_type": "password",
+                    "username": email,
+                    "password": password
+                },
+                headers={"Content-Type": "application/json"}
+            )
+            
+            if response.status_code == 200:
+                token = response.json().get("access_token")
+                self.auth_header = {"Authorization": f"Bearer {token}"}
+                print("  ✓ Authentication successful (NSFW content enabled)")
+            else:
+                print(f"  [!] Authentication failed (Status: {response.status_code}). Continuing as guest.")
+        except Exception as e:
+            print(f"  [!] Authentication error: {e}")
+    
+    def get_rate_limit(self) -> float:
+        return 0.5
+    
+    def request_headers(self) -> Dict[str, str]:
+        """JSON:API headers plus the auth token, if any"""
+        headers = {
+            "Accept": "application/vnd.api+json",
+            "Content-Type": "application/vnd.api+json"
+        }
+        headers.update(self.auth_header)
+        return headers
+    
+    def page_url(self, ids: range) -> str:
+        """URL of the entries with the given IDs (at most PAGE_LIMIT)"""
+        # include=mappings fetches external IDs in the same request
+        return (
+            f"{self.API_URL}?page[limit]={self.PAGE_LIMIT}&filter[id]={','.join(map(str, ids))}"
+            f"&sort=id&include=mappings&{self.FIELDS}"
+        )
+    
+    @classmethod
+    def width_for(cls, max_id: int, count: int) -> int:
+        """Shard width splitting IDs 1..max_id into count shards, rounded up to SHARD_ALIGN"""
+        return max(1, math.ceil(max_id / count / cls.SHARD_ALIGN)) * cls.SHARD_ALIGN
+    
+    def plan_shard_width(self, count: int) -> int:
+        """
+        Plan the shard width for count shards from the current highest ID
+        
+        Run once and hand the result to every job of a sharded crawl:
+        widths planned at different times change whenever the highest ID
+        crosses a multiple of count * SHARD_ALIGN.
+        """
+        async def fetch() -> int:
+            async with AsyncRateLimitedSession(self.get_rate_limit(), 1, self.get_rate_quotas()) as session:
+                return await self.fetch_max_id(session)
+        
+        return self.width_for(asyncio.run(fetch()), count)
+    
+    def plan_shards(self, width: int, count: int) -> List[Dict[str, Any]]:
+        """
+        Split the ID space into contiguous ID ranges
+        
+        Args:
+            width: IDs per shard
+            count: Number of shards
+        
+        Returns:
+            Shard checkpoints; the last shard is open-ended so entries
+            above count * width are still picked up
+        """
+        shards = []
+        for index in range(count):
+            start = index * width + 1
+            end = None if index == count - 1 else (index + 1) * width + 1
+            shards.append({
+                "start": start,
+                "end": end,
+                "cursor": start,  # lowest ID not crawled yet
+                "results_offset": 0,
+                "done": False
+            })
+        return shards
+    
+    def shard_sink(self, index: int) -> JsonlSink:
+        """Results log of one shard (1-based)"""
+        return JsonlSink(self.checkpoint_dir / f"kitsu-results.shard-{index}.jsonl")
+    
+    def scrape(self):
+        """Scrape Kitsu data shard by shard"""
+        asyncio.run(self.scrape_shards())
+    
+    async def fetch_max_id(self, session: AsyncRateLimitedSession) -> int:
+        """
+        Highest entry ID
+        
+        Raises:
+            Exception: If the listing cannot be fetched
+        """
+        response = await session.get(
+            f"{self.API_URL}?page[limit]=1&sort=-id&fields[{self.media_type}]=slug",
+            headers=self.request_headers()
+        )
+        if response.status_code != 200:
+            print(f"  [!] Could not read the highest Kitsu ID (HTTP {response.status_code})")
+            raise Exception(f"Kitsu ID listing returned HTTP {response.status_code}")
+        data = response.json().get('data') or [{}]
+        return int(data[0].get('id', 0))
+    
+    async def scrape_shards(self):
+        """Crawl the owned shards concurrently, then merge their logs in order"""
+        count = self.shard[1] if self.shard else self.SHARDS
+        owned = [self.shard[0]] if self.shard else list(range(1, count + 1))
+        
+        async with AsyncRateLimitedSession(self.get_rate_limit(), len(owned), self.get_rate_quotas()) as session:
+            # The open-ended last shard is crawled up to the current highest ID
+            max_id = await self.fetch_max_id(session)
+            
+            shards = self.checkpoint.get('shards')
+            width = self.checkpoint.get('shard_width')
+            if shards and (len(shards) != count or width is None
+                           or (self.shard_width is not None and width != self.shard_width)):
+                print(f"  [WARN] Checkpoint shards do not match {count} shards of "
+                      f"{self.shard_width or 'planned'} IDs; starting over")
+                for index in range(1, len(shards) + 1):
+                    self.shard_sink(index).remove()
+                shards = None
+            
+            if not shards:
+                width = self.shard_width or self.width_for(max_id, count)
+                shards = self.plan_shards(width, count)
+                self.checkpoint['shards'] = shards
+                self.checkpoint['shard_width'] = width
+                self.save_checkpoint(self.checkpoint)
+                print(f"IDs split into {count} shards of {width} (highest ID {max_id})")
+            
+            sinks = {}
+            for index in owned:
+                shard = shards[index - 1]
+                sink = self.shard_sink(index)
+                if sink.size() < shard['results_offset']:
+                    print(f"  [WARN] Shard {index} log is missing committed items, restarting the shard")
+                    shard.update(cursor=shard['start'], results_offset=0, done=False)
+                sink.open(resume=True, offset=shard['results_offset'])
+                sinks[index] = sink
+            
+            try:
+                await asyncio.gather(*(
+                    self.crawl_shard(session, index, shards[index - 1], sinks[index], max_id)
+                    for index in owned
+                ))
+            finally:
+                for sink in sinks.values():
+                    sink.close()
+        
+        unfinished = [index for index in owned if not shards[index - 1]['done']]
+        if unfinished:
+            raise Exception(f"Shards {unfinished} did not finish; rerun to resume them")
+        
+        # Merge in shard order so the output is deterministic
+        for index in owned:
+            for item in sinks[index].iter_items():
+                self.add_result(item)
+        
+        # One checkpoint commits the merged log and drops the shard cursors
+        self.checkpoint.pop('shards')
+        self.checkpoint.pop('shard_width', None)
+        self.save_checkpoint(self.checkpoint)
+        for sink in sinks.values():
+            sink.remove()
+    
+    async def crawl_shard(self, session: AsyncRateLimitedSession, index: int,
+                          shard: Dict[str, Any], sink: JsonlSink, max_id: int):
+        """
+        Walk one shard's ID range, checkpointing after every window
+        
+        Args:
+            session: Shared session
+            index: Shard number (1-based)
+            shard: The shard's checkpoint entry (updated in place)
+            sink: The shard's results log
+            max_id: Highest entry ID (where an open-ended shard stops)
+        
+        Raises:
+            Exception: If Kitsu answers with IDs outside the requested window,
+                i.e. the id filter was not applied
+        """
+        consecutive_errors = 0
+        
+        if shard['done']:
+            print(f"  [Shard {index}] Already finished")
+            return
+        
+        end = shard['end'] if shard['end'] is not None else max_id + 1
+        print(f"  [Shard {index}] Starting from ID {shard['cursor']}...")
+        
+        while shard['cursor'] < end:
+            cursor = shard['cursor']
+            ids = range(cursor, min(cursor + self.PAGE_LIMIT, end))
+            try:
+                response = await session.get(self.page_url(ids), headers=self.request_headers())
+                data = response.json()
+            except Exception as e:
+                print(f"  [ERROR] [Shard {index}] IDs from {cursor} failed: {e}")
+                consecutive_errors += 1
+                if consecutive_errors >= self.MAX_CONSECUTIVE_ERRORS:
+                    return
+                await asyncio.sleep(5)
+                continue
+            
+            consecutive_errors = 0
+            items = data.get('data', [])
+            
+            # Create a lookup dict for mappings from the 'included' section
+            # Structure: { mapping_id: { externalSite, externalId } }
+            mapping_lookup = {
+                item['id']: item['attributes']
+                for item in data.get('included', [])
+                if item.get('type') == 'mappings'
+            }
+            
+            stray = [item.get('id') for item in items if int(item.get('id', 0)) not in ids]
+            if stray:
+                print(f"  [!] [Shard {index}] Asked for IDs {ids.start}-{ids.stop - 1}, got {stray[:5]}")
+                raise Exception("Kitsu ignored the filter[id] list; refusing to crawl unfiltered pages")
+            
+            if items:
+                print(f"  [Shard {index}] IDs {ids.start}-{ids.stop - 1} - {len(items)} items")
+            
+            for item in items:
+                try:
+                    sink.write(self.process_item(item, mapping_lookup))
+                except Exception as e:
+                    print(f"    [WARN] Failed to process item: {e}")
+            
+            # The next window starts after this one, whether or not its IDs exist
+            shard['cursor'] = ids.stop
+            shard['results_offset'] = sink.commit()
+            self.save_checkpoint(self.checkpoint)
+        
+        print(f"\n✓ [Shard {index}] Reached ID {end - 1}")
+        if sink.size() == 0 and shard['start'] <= max_id:
+            print(f"  [WARN] [Shard {index}] No entries in IDs {shard['start']}-{end - 1}; check the id filter")
+        shard['done'] = True
+        self.save_checkpoint(self.checkpoint)
+    
+    @classmethod
+    def merge_shard_outputs(cls, media_type: str, count: int) -> int:
+        """
+        Combine the outputs of shards crawled in separate processes
+        
+        Shards are read in order. Their ID ranges do not overlap, but should
+        an entry still show up twice (e.g. shards planned with different
+        boundaries) it keeps its position from the first shard and its data
+        from the last.
+        
+        Args:
+            media_type: 'anime' or 'manga'
+            count: Number of shards
+        
+        Returns:
+            Number of items written
+        
+        Raises:
+            FileNotFoundError: If a shard output is missing
+        """
+        output_dir = Path(f"scraped-data/{media_type}")
+        merged = {}
+        
+        for index in range(1, count + 1):
+            shard_file = cls.shard_output_file(output_dir, media_type, index, count)
+            if not shard_file.exists():
+                print(f"[!] Missing shard output {shard_file}")
+                raise FileNotFoundError(f"File not found: {shard_file}")
+            
+            items = load_json(shard_file)
+            print(f"  Shard {index}/{count}: {len(items)} items")
+            for item in items:
+                merged[item['id']] = item
+        
+        output_file = output_dir / f"kitsu-{media_type}.json"
+        save_json(output_file, list(merged.values()))
+        print(f"\n✓ Saved {len(merged)} items to {output_file}")
+        return len(merged)
+    
+    @abstractmethod
+    def process_item(self, item: Dict[str, Any], mapping_lookup: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Convert one Kitsu item to the standardized item format"""
+        pass
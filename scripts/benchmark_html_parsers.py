@@ -0,0 +1,112 @@
+"""
+Benchmark the Anime-Planet page parsing backends on saved browse pages
+File: scripts/benchmark_html_parsers.py
+
+Runs on the pages committed under fixtures/animeplanet by default;
+--download N adds live browse pages to the fixtures directory.
+"""
+import sys
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scrapers.anime.animeplanet_parsers import PAGE_PARSERS
+
+BROWSE_URL = "https://www.anime-planet.com/anime/all"
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures" / "animeplanet"
+
+def download_pages(fixtures_dir: Path, count: int):
+    """Save browse pages 1..count as fixtures (skipping ones already saved)"""
+    from curl_cffi import requests as cffi_requests
+    
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    session = cffi_requests.Session(impersonate="chrome120")
+    
+    for page in range(1, count + 1):
+        path = fixtures_dir / f"page-{page:03d}.html"
+        if path.exists():
+            continue
+        response = session.get(f"{BROWSE_URL}?page={page}", timeout=30)
+        if response.status_code != 200:
+            print(f"[!] Page {page}: HTTP {response.status_code}, stopping")
+            break
+        path.write_bytes(response.content)
+        print(f"  Saved {path}")
+        time.sleep(6)
+
+def bench(parser, pages, repeat):
+    """Parse every page repeat times and return the best time per page"""
+    times = []
+    for content in pages:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parser.parse_page(content)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        times.append(best)
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Anime-Planet HTML parsing backends')
+    parser.add_argument(
+        '--fixtures',
+        default=str(FIXTURES_DIR),
+        help='Directory of saved browse pages (*.html, default: the committed fixtures)'
+    )
+    parser.add_argument(
+        '--download',
+        type=int,
+        metavar='N',
+        help='First save browse pages 1..N into the fixtures directory'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='Parses per page and backend; the fastest is reported'
+    )
+    
+    args = parser.parse_args()
+    fixtures_dir = Path(args.fixtures)
+    
+    if args.download:
+        download_pages(fixtures_dir, args.download)
+    
+    paths = sorted(fixtures_dir.glob('*.html'))
+    if not paths:
+        print(f"[!] No *.html fixtures in {fixtures_dir} (use --download N to save some)")
+        return 1
+    pages = [path.read_bytes() for path in paths]
+    print(f"{len(pages)} pages, {sum(len(p) for p in pages) / 1e6:.1f} MB\n")
+    
+    backends = {name: cls() for name, cls in PAGE_PARSERS.items()}
+    results = {}
+    for name, backend in backends.items():
+        times = bench(backend, pages, args.repeat)
+        results[name] = times
+        print(f"  {name:<6} median {statistics.median(times) * 1000:7.2f} ms/page  "
+              f"max {max(times) * 1000:7.2f} ms  total {sum(times):6.2f} s")
+    
+    if 'soup' in results and 'lxml' in results:
+        print(f"\n  Speedup: {sum(results['soup']) / sum(results['lxml']):.2f}x")
+    
+    # Every backend should extract the same cards
+    reference, *others = backends.values()
+    mismatches = 0
+    for path, content in zip(paths, pages):
+        expected = reference.parse_page(content)
+        for backend in others:
+            if backend.parse_page(content) != expected:
+                mismatches += 1
+                print(f"  [!] {path.name}: {backend.name} differs from {reference.name}")
+    print(f"  Pages where the results differ: {mismatches}")
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
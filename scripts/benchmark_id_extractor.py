@@ -0,0 +1,132 @@
+"""
+Benchmark URL -> ID extraction over the anime-offline-database sources
+File: scripts/benchmark_id_extractor.py
+"""
+import sys
+import argparse
+import re
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.file_utils import load_json
+from utils.id_extractor import SERVICE_ALIASES, URLIDExtractor
+
+def legacy_extract(sources):
+    """The substring + re.search ladder the scrapers used before URLIDExtractor"""
+    ids = {}
+    
+    for source in sources:
+        if 'myanimelist.net' in source:
+            match = re.search(r'myanimelist\.net/anime/(\d+)', source)
+            if match:
+                ids['mal'] = match.group(1)
+        elif 'anilist.co' in source:
+            match = re.search(r'anilist\.co/anime/(\d+)', source)
+            if match:
+                ids['anilist'] = match.group(1)
+        elif 'anidb.net' in source:
+            match = re.search(r'anidb\.net/anime/(\d+)', source)
+            if match:
+                ids['anidb'] = match.group(1)
+        elif 'kitsu.app' in source or 'kitsu.io' in source:
+            match = re.search(r'kitsu\.(?:app|io)/anime/(\d+)', source)
+            if match:
+                ids['kitsu'] = match.group(1)
+        elif 'animecountdown.com' in source:
+            match = re.search(r'animecountdown\.com/(\d+)', source)
+            if match:
+                ids['tvdb'] = match.group(1)
+        elif 'livechart.me' in source:
+            match = re.search(r'livechart\.me/anime/(\d+)', source)
+            if match:
+                ids['livechart'] = match.group(1)
+        elif 'anime-planet.com' in source:
+            match = re.search(r'anime-planet\.com/anime/([\w-]+)', source)
+            if match:
+                ids['animeplanet'] = match.group(1)
+        elif 'anisearch.com' in source:
+            match = re.search(r'anisearch\.com/anime/(\d+)', source)
+            if match:
+                ids['anisearch'] = match.group(1)
+        elif 'animenewsnetwork.com' in source:
+            match = re.search(r'id=(\d+)', source)
+            if match:
+                ids['ann'] = match.group(1)
+        elif 'simkl.com' in source:
+            match = re.search(r'simkl\.com/(?:anime|tv|movies?)/(\d+)', source)
+            if match:
+                ids['simkl'] = match.group(1)
+    
+    return ids
+
+def load_sources(database_path):
+    """Source URL lists of every entry, from a local file or the latest release"""
+    if database_path:
+        entries = load_json(database_path).get('data', [])
+    else:
+        from utils.http_utils import RateLimitedSession
+        from utils.http_cache import HttpCache
+        from utils.offline_database import get_offline_database
+        
+        with RateLimitedSession(cache=HttpCache()) as session:
+            database = get_offline_database(session)
+        if database is None:
+            raise Exception("anime-offline-database is not available")
+        entries = database.entries()
+    
+    return [entry.get('sources', []) for entry in entries]
+
+def bench(name, extract, entries, repeat):
+    """Run extract over every entry repeat times and report the best pass"""
+    url_count = sum(len(sources) for sources in entries)
+    best = None
+    
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for sources in entries:
+            extract(sources)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    
+    print(f"  {name:<14} {best * 1000:8.1f} ms  {url_count / best / 1e6:6.2f} M URLs/s")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark URL -> ID extraction')
+    parser.add_argument(
+        '--database',
+        help='Path to anime-offline-database(-minified).json (default: download the latest release)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='Passes per extractor; the fastest is reported'
+    )
+    
+    args = parser.parse_args()
+    
+    entries = load_sources(args.database)
+    print(f"{len(entries):,} entries, {sum(len(s) for s in entries):,} source URLs\n")
+    
+    extractor = URLIDExtractor()
+    legacy = bench("regex ladder", legacy_extract, entries, args.repeat)
+    engine = bench("host dispatch", extractor.extract_ids, entries, args.repeat)
+    print(f"\n  Speedup: {legacy / engine:.2f}x")
+    
+    # Both should agree on every service the ladder knows about
+    mismatches = 0
+    for sources in entries:
+        expected = {SERVICE_ALIASES.get(k, k): v for k, v in legacy_extract(sources).items()}
+        actual = extractor.extract_ids(sources)
+        if any(actual.get(service) != value for service, value in expected.items()):
+            mismatches += 1
+    print(f"  Entries where the results differ: {mismatches:,}")
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
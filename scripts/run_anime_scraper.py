@@ -20,6 +20,7 @@ from scrapers.anime.livechart_scraper import LivechartScraper
 from scrapers.anime.themoviedb_scraper import TMDBAnimeScraper
 from scrapers.anime.tvdb_scraper import TVDBScraper
 from scrapers.anime.imdb_scraper import IMDBScraper
+from utils.cli_utils import parse_shard
 
 def main():
     parser = argparse.ArgumentParser(description='Run anime scraper for a specific service')
@@ -33,9 +34,52 @@ def main():
         ],
         help='Service to scrape'
     )
+    parser.add_argument(
+        '--mode',
+        choices=['full', 'update', 'bulk'],
+        default='full',
+        help='full: scrape everything; update: fetch only changes where supported; '
+             'bulk: ingest the daily ID export (themoviedb)'
+    )
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='I/N',
+        help='kitsu only: crawl shard I of N (1-based) into its own output file'
+    )
+    parser.add_argument(
+        '--shard-width',
+        type=int,
+        metavar='W',
+        help='kitsu only: IDs per shard, as printed by --plan-shards (give every job the same W)'
+    )
+    parser.add_argument(
+        '--plan-shards',
+        type=int,
+        metavar='N',
+        help='kitsu only: print the shard width for N shards (last line of output) and exit'
+    )
+    parser.add_argument(
+        '--merge-shards',
+        type=int,
+        metavar='N',
+        help='kitsu only: combine the outputs of N shards crawled with --shard'
+    )
+    parser.add_argument(
+        '--html-parser',
+        choices=['lxml', 'soup'],
+        help='animeplanet only: HTML parsing backend (default: lxml)'
+    )
     
     args = parser.parse_args()
     
+    if (args.shard or args.merge_shards or args.plan_shards) and args.service != 'kitsu':
+        parser.error('--shard, --plan-shards and --merge-shards are only supported for kitsu')
+    if args.shard_width and not args.shard:
+        parser.error('--shard-width needs --shard')
+    if args.html_parser and args.service != 'animeplanet':
+        parser.error('--html-parser is only supported for animeplanet')
+    
     # Map service to scraper class
     scrapers = {
         'anidb': AniDBScraper,
@@ -61,15 +105,28 @@ def main():
         print(f"STARTING {args.service.upper()} SCRAPER")
         print(f"{'='*70}\n")
         
-        scraper = scrapers[args.service]()
-        scraper.run()
+        if args.merge_shards:
+            KitsuAnimeScraper.merge_shard_outputs('anime', args.merge_shards)
+            return 0
+        
+        if args.plan_shards:
+            print(KitsuAnimeScraper().plan_shard_width(args.plan_shards))
+            return 0
+        
+        if args.shard:
+            scraper = scrapers[args.service](shard=args.shard, shard_width=args.shard_width)
+        elif args.html_parser:
+            scraper = scrapers[args.service](parser=args.html_parser)
+        else:
+            scraper = scrapers[args.service]()
+        scraper.run(mode=args.mode)
         
         print(f"\n{'='*70}")
         print(f"✓✓✓ {args.service.upper()} SCRAPER COMPLETED SUCCESSFULLY")
         print(f"{'='*70}\n")
         
         return 0
-        
+    
     except KeyboardInterrupt:
         print("\n\n[!] Scraper interrupted by user")
         return 130
@@ -12,6 +12,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from scrapers.manga.anilist_scraper import AniListMangaScraper
 from scrapers.manga.myanimelist_scraper import MyAnimeListMangaScraper
 from scrapers.manga.kitsu_scraper import KitsuMangaScraper
+from utils.cli_utils import parse_shard
 
 def main():
     parser = argparse.ArgumentParser(description='Run manga scraper for a specific service')
@@ -21,9 +22,44 @@ def main():
         choices=['anilist', 'myanimelist', 'kitsu'],
         help='Service to scrape'
     )
+    parser.add_argument(
+        '--mode',
+        choices=['full', 'update'],
+        default='full',
+        help='full: scrape everything; update: fetch only changes where supported'
+    )
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='I/N',
+        help='kitsu only: crawl shard I of N (1-based) into its own output file'
+    )
+    parser.add_argument(
+        '--shard-width',
+        type=int,
+        metavar='W',
+        help='kitsu only: IDs per shard, as printed by --plan-shards (give every job the same W)'
+    )
+    parser.add_argument(
+        '--plan-shards',
+        type=int,
+        metavar='N',
+        help='kitsu only: print the shard width for N shards (last line of output) and exit'
+    )
+    parser.add_argument(
+        '--merge-shards',
+        type=int,
+        metavar='N',
+        help='kitsu only: combine the outputs of N shards crawled with --shard'
+    )
     
     args = parser.parse_args()
     
+    if (args.shard or args.merge_shards or args.plan_shards) and args.service != 'kitsu':
+        parser.error('--shard, --plan-shards and --merge-shards are only supported for kitsu')
+    if args.shard_width and not args.shard:
+        parser.error('--shard-width needs --shard')
+    
     # Map service to scraper class
     scrapers = {
         'anilist': AniListMangaScraper,
@@ -37,8 +73,19 @@ def main():
         return 1
     
     try:
-        scraper = scrapers[args.service]()
-        scraper.run()
+        if args.merge_shards:
+            KitsuMangaScraper.merge_shard_outputs('manga', args.merge_shards)
+            return 0
+        
+        if args.plan_shards:
+            print(KitsuMangaScraper().plan_shard_width(args.plan_shards))
+            return 0
+        
+        if args.shard:
+            scraper = scrapers[args.service](shard=args.shard, shard_width=args.shard_width)
+        else:
+            scraper = scrapers[args.service]()
+        scraper.run(mode=args.mode)
         return 0
     except KeyboardInterrupt:
         print("\n\n[!] Scraper interrupted by user")
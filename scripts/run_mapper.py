@@ -20,6 +20,16 @@ def main():
         choices=['anime', 'manga'],
         help='Type of media to map'
     )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Reuse the saved mapper state and only reprocess changed service files'
+    )
+    parser.add_argument(
+        '--verify',
+        action='store_true',
+        help='Check the output against a full rebuild before saving it (needs every service file)'
+    )
     
     args = parser.parse_args()
     
@@ -31,9 +41,9 @@ def main():
             print("Starting manga mapper...")
             mapper = MangaMapper()
         
-        mapper.run()
+        mapper.run(incremental=args.incremental, verify=args.verify)
         return 0
-        
+    
     except KeyboardInterrupt:
         print("\n\n[!] Mapping interrupted by user")
         return 130
@@ -3,18 +3,30 @@ Utility functions package
 File: utils/__init__.py
 """
 
-from .http_utils import RateLimitedSession
+from .http_utils import RateLimitedSession, AsyncRateLimitedSession, TokenBucketLimiter
 from .file_utils import load_json, save_json, file_exists, get_file_age, ensure_directory
-from .id_extractor import extract_id_from_url, normalize_id, is_valid_id
+from .id_extractor import (
+    URLIDExtractor, parse_url, extract_ids_from_urls, extract_id_from_url, normalize_id, is_valid_id
+)
+from .offline_database import OfflineDatabase, get_offline_database
+from .cli_utils import parse_shard
 
 __all__ = [
     'RateLimitedSession',
+    'AsyncRateLimitedSession',
+    'TokenBucketLimiter',
     'load_json',
     'save_json',
     'file_exists',
     'get_file_age',
     'ensure_directory',
+    'URLIDExtractor',
+    'parse_url',
+    'extract_ids_from_urls',
     'extract_id_from_url',
     'normalize_id',
-    'is_valid_id'
+    'is_valid_id',
+    'OfflineDatabase',
+    'get_offline_database',
+    'parse_shard'
 ]
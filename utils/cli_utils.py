@@ -0,0 +1,16 @@
+"""
+Command-line argument helpers shared by the scraper entry scripts
+File: utils/cli_utils.py
+"""
+import argparse
+from typing import Tuple
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a 1-based 'i/N' shard spec"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got {value!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {index} is not in 1..{count}")
+    return index, count
@@ -3,8 +3,9 @@ File I/O utilities
 File: utils/file_utils.py
 """
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 def load_json(filepath: Union[str, Path]) -> Any:
     """
@@ -38,6 +39,9 @@ def save_json(filepath: Union[str, Path], data: Any, pretty: bool = False):
     """
     Save data to JSON file
     
+    The data is written to a temporary file next to the target and renamed
+    over it, so readers never see a half-written file.
+    
     Args:
         filepath: Path to save JSON file
         data: Data to serialize
@@ -48,11 +52,14 @@ def save_json(filepath: Union[str, Path], data: Any, pretty: bool = False):
     # Create parent directories if they don't exist
     filepath.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(filepath, 'w', encoding='utf-8') as f:
+    tmp_path = filepath.with_name(filepath.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         if pretty:
             json.dump(data, f, indent=2, ensure_ascii=False)
         else:
             json.dump(data, f, ensure_ascii=False)
+    
+    os.replace(tmp_path, filepath)
 
 def file_exists(filepath: Union[str, Path]) -> bool:
     """
@@ -95,3 +102,186 @@ def ensure_directory(dirpath: Union[str, Path]):
         dirpath: Directory path
     """
     Path(dirpath).mkdir(parents=True, exist_ok=True)
+
+class JsonlSink:
+    """Append-only JSON Lines file for streaming scraped items to disk"""
+    
+    def __init__(self, filepath: Union[str, Path], fsync_every: int = 100):
+        """
+        Initialize sink
+        
+        Args:
+            filepath: Path of the .jsonl file
+            fsync_every: Number of writes between forced flushes to disk
+        """
+        self.filepath = Path(filepath)
+        self.fsync_every = fsync_every
+        self.count = 0  # items written through this sink (including resumed ones)
+        self._file = None
+        self._pending = 0
+    
+    def size(self) -> int:
+        """Current size of the file in bytes (0 if it doesn't exist)"""
+        return self.filepath.stat().st_size if self.filepath.exists() else 0
+    
+    def open(self, resume: bool = True, offset: Optional[int] = None):
+        """
+        Open the sink for appending
+        
+        Args:
+            resume: Keep items left by an earlier, unfinished run (otherwise truncate)
+            offset: When resuming, cut the file back to this byte offset first
+                (a position previously returned by commit)
+        """
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        
+        if resume and self.filepath.exists():
+            if offset is not None:
+                with open(self.filepath, 'rb+') as f:
+                    f.truncate(offset)
+            self._drop_torn_tail()
+            with open(self.filepath, 'rb') as f:
+                self.count = sum(1 for line in f if line.strip())
+        else:
+            self.count = 0
+        
+        self._file = open(self.filepath, 'a' if resume else 'w', encoding='utf-8')
+        self._pending = 0
+    
+    def _drop_torn_tail(self):
+        """Cut off a partial last line left by a crash mid-write"""
+        with open(self.filepath, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+
+            # Scan backwards for the last complete line
+            pos = size
+            while pos > 0:
+                step = min(4096, pos)
+                f.seek(pos - step)
+                chunk = f.read(step)
+                newline = chunk.rfind(b'\n')
+                if newline != -1:
+                    end = pos - step + newline + 1
+                    break
+                pos -= step
+            else:
+                end = 0
+
+            if end != size:
+                f.truncate(end)
+
+    def write(self, item: Any):
+        """Append one item as a JSON line"""
+        self._file.write(json.dumps(item, ensure_ascii=False))
+        self._file.write('\n')
+        self.count += 1
+        self._pending += 1
+        
+        if self._pending >= self.fsync_every:
+            self.sync()
+    
+    def sync(self):
+        """Flush buffered lines and fsync them to disk"""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+    
+    def commit(self) -> int:
+        """
+        Make everything written so far durable
+        
+        Returns:
+            Byte offset of the end of the last complete line
+        """
+        if self._file is None:
+            return self.size()
+        self.sync()
+        return os.fstat(self._file.fileno()).st_size
+    
+    def close(self):
+        """Sync and close the file"""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+    
+    def iter_items(self) -> Iterator[Any]:
+        """Yield every item currently in the file"""
+        if not self.filepath.exists():
+            return
+        with open(self.filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line from a crash mid-write
+                    continue
+    
+    def compact(self, output_path: Union[str, Path], key: str = 'id',
+                base_path: Optional[Union[str, Path]] = None) -> int:
+        """
+        Write all items to a JSON array file, keeping the last copy of each key
+        
+        Items are streamed twice (once to find the last copy of each key,
+        once to write) so memory stays flat regardless of file size.
+        
+        Args:
+            output_path: Destination .json file
+            key: Field used to deduplicate items
+            base_path: Existing JSON array whose items are kept unless the
+                log has an item with the same key (may be output_path itself)
+            
+        Returns:
+            Number of items written
+        """
+        self.sync()
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        last_seen = {}
+        for index, item in enumerate(self.iter_items()):
+            last_seen[str(item.get(key)) if isinstance(item, dict) else index] = index
+        keep = set(last_seen.values())
+        
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        written = 0
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            out.write('[')
+            
+            if base_path is not None and Path(base_path).exists():
+                for item in load_json(base_path):
+                    if isinstance(item, dict) and str(item.get(key)) in last_seen:
+                        continue
+                    if written:
+                        out.write(', ')
+                    json.dump(item, out, ensure_ascii=False)
+                    written += 1
+            del last_seen
+            
+            for index, item in enumerate(self.iter_items()):
+                if index not in keep:
+                    continue
+                if written:
+                    out.write(', ')
+                json.dump(item, out, ensure_ascii=False)
+                written += 1
+            out.write(']')
+            out.flush()
+            os.fsync(out.fileno())
+        
+        os.replace(tmp_path, output_path)
+        return written
+    
+    def remove(self):
+        """Close and delete the file"""
+        self.close()
+        if self.filepath.exists():
+            self.filepath.unlink()
@@ -0,0 +1,27 @@
+"""
+HTML parsing helpers for the lxml backend of the HTML scrapers
+File: utils/html_utils.py
+"""
+from typing import Union
+
+from lxml import etree, html
+
+def has_class(name: str) -> str:
+    """XPath predicate matching elements whose class attribute contains name (like CSS .name)"""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+def xpath(expression: str) -> etree.XPath:
+    """Compile an XPath expression once, for reuse on every page"""
+    return etree.XPath(expression)
+
+def parse_document(content: Union[str, bytes]) -> html.HtmlElement:
+    """Parse a full HTML page"""
+    return html.document_fromstring(content)
+
+def parse_fragment(content: str) -> html.HtmlElement:
+    """Parse an HTML snippet (e.g. a tooltip) under a wrapper <div>"""
+    return html.fragment_fromstring(content, create_parent='div')
+
+def element_text(element: html.HtmlElement) -> str:
+    """Text of an element the way BeautifulSoup's get_text(strip=True) returns it"""
+    return ''.join(text.strip() for text in element.itertext())
@@ -0,0 +1,239 @@
+"""
+On-disk HTTP response cache with conditional revalidation
+File: utils/http_cache.py
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import requests
+
+from utils.file_utils import load_json, save_json
+
+class _CacheTee:
+    """
+    File-like wrapper around a streamed response body that copies it to disk
+    
+    The copy is only committed to the cache once the body has been read
+    to the end, so an aborted download never leaves a truncated entry.
+    """
+    
+    def __init__(self, raw, tmp_path: Path, on_complete):
+        self.raw = raw
+        self.tmp_path = tmp_path
+        self.on_complete = on_complete
+        self.file = open(tmp_path, 'wb')
+        self.size = 0
+    
+    def read(self, amt: Optional[int] = None) -> bytes:
+        data = self.raw.read(amt, decode_content=True)
+        if self.file is None:
+            return data
+        
+        if data:
+            self.file.write(data)
+            self.size += len(data)
+        else:
+            # End of body - move the copy into the cache
+            self.file.close()
+            self.file = None
+            self.on_complete(self.tmp_path, self.size)
+        return data
+    
+    def close(self):
+        if self.file is not None:
+            # Body not read to the end, drop the partial copy
+            self.file.close()
+            self.file = None
+            self.tmp_path.unlink(missing_ok=True)
+        self.raw.close()
+    
+    def release_conn(self):
+        release = getattr(self.raw, 'release_conn', None)
+        if release:
+            release()
+
+class HttpCache:
+    """
+    Response bodies stored on disk, keyed by URL
+    
+    Entries keep the ETag / Last-Modified validators of the response they
+    came from, so a later request can be made conditional and answered
+    with a 304 instead of the full body. The cache is bounded in size;
+    least recently used entries are evicted first.
+    """
+    
+    INDEX_FILE = "index.json"
+    
+    def __init__(self, cache_dir: Union[str, Path] = "cache/http", max_bytes: int = 1 << 30):
+        """
+        Initialize cache
+        
+        Args:
+            cache_dir: Directory holding the bodies and the index
+            max_bytes: Total size of stored bodies before LRU eviction kicks in
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+    
+    @property
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        """URL key -> entry metadata, loaded on first use"""
+        if self._index is None:
+            self._index = {}
+            index_path = self.cache_dir / self.INDEX_FILE
+            if index_path.exists():
+                try:
+                    self._index = load_json(index_path)
+                except (json.JSONDecodeError, OSError) as e:
+                    print(f"  [WARN] Corrupted HTTP cache index, starting empty: {e}")
+        return self._index
+    
+    def _save_index(self):
+        save_json(self.cache_dir / self.INDEX_FILE, self.index, pretty=True)
+    
+    @staticmethod
+    def key(url: str) -> str:
+        """Cache key (and body file name) for a URL"""
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+    
+    def body_path(self, url: str) -> Optional[Path]:
+        """Path of the cached body for a URL, or None if not cached"""
+        entry = self.index.get(self.key(url))
+        if entry is None:
+            return None
+        path = self.cache_dir / entry["file"]
+        return path if path.exists() else None
+    
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a cached URL"""
+        entry = self.index.get(self.key(url))
+        if entry is None or self.body_path(url) is None:
+            return {}
+        
+        headers = {}
+        if entry.get("etag"):
+            headers['If-None-Match'] = entry["etag"]
+        if entry.get("last_modified"):
+            headers['If-Modified-Since'] = entry["last_modified"]
+        return headers
+    
+    def handle(self, url: str, response: requests.Response) -> Optional[requests.Response]:
+        """
+        Route a streamed response through the cache
+        
+        A 304 is turned into a 200 served from the cached body. A 200 with
+        validators is passed through while its body is copied to disk.
+        Anything else is returned untouched.
+        
+        Args:
+            url: Requested URL (the cache key)
+            response: Response from a request made with stream=True
+        
+        Returns:
+            Response to hand to the caller, or None if the server answered
+            304 but the cached body is gone; the entry is dropped and the
+            request must be repeated (it will no longer be conditional)
+        
+        Raises:
+            requests.HTTPError: On a 304 to a request that was not conditional
+        """
+        if response.status_code == 304:
+            response.close()
+            cached = self.cached_response(url, response)
+            if cached is not None:
+                print(f"  ✓ Not modified, using cached copy of {url}")
+                return cached
+            
+            # The body was evicted or deleted after the request was made conditional
+            self.forget(url)
+            sent = response.request.headers if response.request is not None else {}
+            if 'If-None-Match' in sent or 'If-Modified-Since' in sent:
+                print(f"  [!] Cached copy of {url} is gone, fetching it again")
+                return None
+            raise requests.HTTPError(f"304 Not Modified without a cached body for {url}", response=response)
+        
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return response
+        
+        key = self.key(url)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        def commit(tmp_path: Path, size: int):
+            os.replace(tmp_path, self.cache_dir / key)
+            self.index[key] = {
+                "url": url,
+                "file": key,
+                "etag": etag,
+                "last_modified": last_modified,
+                "content_type": response.headers.get('Content-Type'),
+                "size": size,
+                "last_used": time.time()
+            }
+            self.evict()
+            self._save_index()
+        
+        response.raw = _CacheTee(response.raw, self.cache_dir / f"{key}.tmp", commit)
+        response.cache_path = self.cache_dir / key
+        return response
+    
+    def cached_response(self, url: str, not_modified: Optional[requests.Response] = None) -> Optional[requests.Response]:
+        """
+        Build a 200 response whose body streams from the cached file
+        
+        Args:
+            url: Cached URL
+            not_modified: The 304 response, if any (its validators refresh the entry)
+        
+        Returns:
+            Response, or None if the URL is not cached
+        """
+        path = self.body_path(url)
+        if path is None:
+            return None
+        
+        entry = self.index[self.key(url)]
+        if not_modified is not None:
+            entry["etag"] = not_modified.headers.get('ETag', entry.get("etag"))
+            entry["last_modified"] = not_modified.headers.get('Last-Modified', entry.get("last_modified"))
+        entry["last_used"] = time.time()
+        self._save_index()
+        
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.reason = 'OK (cached)'
+        if entry.get("content_type"):
+            response.headers['Content-Type'] = entry["content_type"]
+        response.headers['Content-Length'] = str(entry["size"])
+        response.raw = open(path, 'rb')
+        response.from_cache = True
+        response.cache_path = path
+        return response
+    
+    def forget(self, url: str):
+        """Drop a URL's entry (and its body, if still there)"""
+        entry = self.index.pop(self.key(url), None)
+        if entry is not None:
+            (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+            self._save_index()
+    
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        total = sum(entry["size"] for entry in self.index.values())
+        if total <= self.max_bytes:
+            return
+        
+        for key, entry in sorted(self.index.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+            del self.index[key]
+            total -= entry["size"]
+            print(f"  Evicted {entry['url']} from HTTP cache")
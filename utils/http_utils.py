@@ -2,77 +2,405 @@
 HTTP utilities with rate limiting and retry logic
 File: utils/http_utils.py
 """
+import asyncio
+import threading
 import time
 import requests
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from utils.http_cache import HttpCache
+
+# A quota is (max requests, window in seconds), e.g. (60, 60) for 60/min
+Quota = Tuple[int, float]
+
+class TokenBucketLimiter:
+    """
+    Multi-window token-bucket rate limiter
+    
+    Each quota is a bucket holding up to `requests` tokens that refills
+    at requests/seconds tokens per second. A request takes one token from
+    every bucket, so bursts up to the smallest bucket are allowed while
+    every window's average rate is respected. Thread-safe, so sessions
+    in different threads can share one budget.
+    """
+    
+    def __init__(self, quotas: List[Quota]):
+        """
+        Initialize limiter
+        
+        Args:
+            quotas: List of (max requests, window seconds) pairs,
+                e.g. [(3, 1), (60, 60)] for 3/s and 60/min
+        """
+        if not quotas:
+            raise ValueError("At least one quota is required")
+        
+        self.quotas = [(int(requests), float(seconds)) for requests, seconds in quotas]
+        self.capacity = [requests for requests, _ in self.quotas]
+        self.refill_rate = [requests / seconds for requests, seconds in self.quotas]
+        
+        # Buckets start full; tokens go negative while requests are queued
+        self.tokens = [float(requests) for requests in self.capacity]
+        self.updated = time.monotonic()
+        self.in_flight = 0  # reservations whose response has not come back yet
+        self.paused_until = 0.0  # monotonic time before which nothing is sent
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float):
+        """Add the tokens earned since the last update"""
+        elapsed = now - self.updated
+        self.updated = now
+        for i, rate in enumerate(self.refill_rate):
+            self.tokens[i] = min(self.capacity[i], self.tokens[i] + elapsed * rate)
+    
+    def reserve(self) -> float:
+        """
+        Take a token from every bucket
+        
+        Buckets may go into debt, which queues later callers behind this
+        one in order.
+        
+        Returns:
+            Seconds the caller must wait before sending the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            
+            self.in_flight += 1
+            delay = max(0.0, self.paused_until - now)
+            for i, rate in enumerate(self.refill_rate):
+                self.tokens[i] -= 1
+                if self.tokens[i] < 0:
+                    delay = max(delay, -self.tokens[i] / rate)
+            return delay
+    
+    def pause(self, seconds: float):
+        """Hold back every request for the next `seconds` seconds"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+    
+    def release(self):
+        """Mark a reserved request as answered (or abandoned)"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+    
+    def observe(self, remaining: int):
+        """
+        Sync the longest-window bucket with the server's remaining count
+        
+        Requests reserved but not answered yet are not in the server's
+        count, so they are taken off it. The bucket is only ever lowered:
+        raising it would hand out tokens that queued reservations already
+        owe, letting sessions that share the host exceed the quota.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            i = max(range(len(self.quotas)), key=lambda j: self.quotas[j][1])
+            self.tokens[i] = min(self.tokens[i], float(remaining - self.in_flight))
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+_host_limiters: Dict[str, TokenBucketLimiter] = {}
+_host_limiters_lock = threading.Lock()
+
+def get_host_limiter(host: str, quotas: List[Quota]) -> TokenBucketLimiter:
+    """
+    Get the limiter shared by every session talking to a host
+    
+    The first caller's quotas define the host's budget; later callers
+    get the same limiter.
+    
+    Args:
+        host: Host name (e.g. 'api.jikan.moe')
+        quotas: Quotas to use if the host has no limiter yet
+        
+    Returns:
+        Shared limiter for the host
+    """
+    with _host_limiters_lock:
+        limiter = _host_limiters.get(host)
+        if limiter is None:
+            limiter = TokenBucketLimiter(quotas)
+            _host_limiters[host] = limiter
+        return limiter
+
+def read_rate_limit_headers(response: requests.Response) -> Tuple[Optional[int], Optional[float], Optional[float]]:
+    """
+    Read the rate limit state a server reports in its response headers
+    
+    Args:
+        response: Response to inspect
+        
+    Returns:
+        (X-RateLimit-Remaining, seconds until X-RateLimit-Reset, Retry-After seconds),
+        each None when the header is missing or unparsable
+    """
+    headers = response.headers
+    remaining = reset_in = retry_after = None
+    
+    try:
+        remaining = int(headers['X-RateLimit-Remaining'])
+    except (KeyError, ValueError):
+        pass
+    
+    try:
+        reset = float(headers['X-RateLimit-Reset'])
+        # Either a Unix timestamp or a number of seconds
+        reset_in = max(0.0, reset - time.time()) if reset > 1e9 else reset
+    except (KeyError, ValueError):
+        pass
+    
+    value = headers.get('Retry-After')
+    if value:
+        try:
+            retry_after = max(0.0, float(value))
+        except ValueError:
+            try:
+                retry_after = max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    
+    return remaining, reset_in, retry_after
+
+class _ServerErrorRetry(Retry):
+    """urllib3 Retry that leaves 429 responses to the rate-limited sessions"""
+    
+    RETRY_AFTER_STATUS_CODES = frozenset([413, 503])
+
+def build_session(pool_size: int = 10) -> requests.Session:
+    """
+    Create a requests session with the shared retry strategy and default headers
+    
+    Args:
+        pool_size: Number of keep-alive connections kept per host
+        
+    Returns:
+        Configured session
+    """
+    session = requests.Session()
+    
+    # Configure retry strategy (429 is handled by the rate-limited sessions)
+    retry_strategy = _ServerErrorRetry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"]
+    )
+    
+    adapter = HTTPAdapter(
+        max_retries=retry_strategy,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    # Set default headers
+    session.headers.update({
+        'User-Agent': 'AnimeMangaMapper/1.0 (https://github.com/itsmechinmoy/animanga-mapped)'
+    })
+    
+    return session
+
 class RateLimitedSession:
-    """HTTP session with automatic rate limiting and retries"""
+    """
+    HTTP session with automatic rate limiting and retries
+    
+    Pacing adapts to what the server reports: Retry-After and a 429 pause
+    all requests to the host, X-RateLimit-Remaining resyncs the token
+    bucket (or, with X-RateLimit-Reset, spreads the remaining requests
+    over the rest of the window), and 429 responses are retried here
+    instead of by urllib3.
+    """
     
-    def __init__(self, rate_limit: float = 1.0):
+    MAX_RATE_LIMIT_RETRIES = 5
+    
+    def __init__(self, rate_limit: float = 1.0, quotas: Optional[List[Quota]] = None,
+                 cache: Optional[HttpCache] = None):
         """
         Initialize rate-limited session
         
         Args:
-            rate_limit: Minimum seconds between requests
+            rate_limit: Minimum seconds between requests (used without quotas)
+            quotas: Per-host (max requests, window seconds) quotas; when set,
+                requests are paced by a token bucket shared per host instead
+            cache: On-disk cache used by requests made with cache=True
         """
         self.rate_limit = rate_limit
+        self.quotas = quotas
+        self.cache = cache
         self.last_request = 0
+        self.gap = rate_limit  # current seconds between requests without quotas
+        self.paused_until = 0.0
         
         # Create session with retry strategy
-        self.session = requests.Session()
-        
-        # Configure retry strategy
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"]
-        )
-        
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-        
-        # Set default headers
-        self.session.headers.update({
-            'User-Agent': 'AnimeMangaMapper/1.0 (https://github.com/itsmechinmoy/animanga-mapped)'
-        })
-    
-    def _wait(self):
+        self.session = build_session()
+    
+    def _limiter(self, url: str) -> Optional[TokenBucketLimiter]:
+        """Shared limiter for the URL's host (None without quotas)"""
+        if not self.quotas:
+            return None
+        return get_host_limiter(urlsplit(url).netloc, self.quotas)
+    
+    def _release(self, url: str):
+        """Tell the host's limiter the request reserved by _wait is done"""
+        limiter = self._limiter(url)
+        if limiter:
+            limiter.release()
+    
+    def _wait(self, url: str):
         """Wait for rate limit if necessary"""
-        elapsed = time.time() - self.last_request
-        if elapsed < self.rate_limit:
-            sleep_time = self.rate_limit - elapsed
-            time.sleep(sleep_time)
+        limiter = self._limiter(url)
+        if limiter:
+            limiter.acquire()
+            self.last_request = time.time()
+            return
+        
+        ready = max(self.last_request + self.gap, self.paused_until)
+        now = time.time()
+        if ready > now:
+            time.sleep(ready - now)
         self.last_request = time.time()
     
-    def get(self, url: str, **kwargs) -> requests.Response:
+    def pause(self, url: str, seconds: float):
+        """Hold back requests to the URL's host for the given number of seconds"""
+        limiter = self._limiter(url)
+        if limiter:
+            limiter.pause(seconds)
+        else:
+            self.paused_until = max(self.paused_until, time.time() + seconds)
+    
+    def _adapt(self, url: str, response: requests.Response) -> Optional[float]:
         """
-        GET request with rate limiting
+        Adjust pacing from a response's rate limit headers
+        
+        Returns:
+            Seconds the server asked us to wait, if it said so
+        """
+        remaining, reset_in, wait = read_rate_limit_headers(response)
+        
+        if remaining is not None:
+            limiter = self._limiter(url)
+            if limiter:
+                limiter.observe(remaining)
+            elif reset_in is not None:
+                # Spread what is left evenly over the rest of the window,
+                # but never faster than the configured rate
+                self.gap = max(self.rate_limit, reset_in / (remaining + 1))
+            
+            if remaining == 0 and reset_in is not None and wait is None:
+                wait = reset_in
+        
+        if wait is not None:
+            self.pause(url, wait)
+        return wait
+    
+    def backoff(self, response: requests.Response, default: float = 60.0) -> float:
+        """
+        Pause after a rate limit reported outside the HTTP status (e.g. in a body)
+        
+        Args:
+            response: Response that reported the rate limit
+            default: Seconds to wait if the headers don't say
+            
+        Returns:
+            Seconds the next request will be held back
+        """
+        wait = self._adapt(response.url, response)
+        if wait is None:
+            wait = default
+            self.pause(response.url, wait)
+        return wait
+    
+    def _retry_delay(self, url: str, response: requests.Response, attempt: int) -> float:
+        """Pause before retrying a 429, using the headers or exponential backoff"""
+        wait = self._adapt(url, response)
+        if wait is None:
+            wait = min(60.0, 5.0 * 2 ** attempt)
+            self.pause(url, wait)
+        print(f"  [!] Rate limited (429), retrying in {wait:.0f}s...")
+        return wait
+    
+    def _prepare_cache(self, method: str, url: str, kwargs: Dict[str, Any]) -> bool:
+        """
+        Turn a cache=True request into a streamed conditional request
+        
+        Returns:
+            True if the response should be routed through the cache
+        """
+        if not kwargs.pop('cache', False) or self.cache is None or method != 'GET':
+            return False
+        
+        kwargs['headers'] = {**self.cache.conditional_headers(url), **kwargs.get('headers', {})}
+        kwargs['stream'] = True
+        return True
+    
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Request with rate limiting
         
         Args:
+            method: HTTP method
             url: URL to request
-            **kwargs: Additional arguments to pass to requests.get
+            **kwargs: Additional arguments to pass to requests; cache=True
+                revalidates against (and fills) the on-disk cache
             
         Returns:
             Response object
         """
-        self._wait()
+        original_kwargs = dict(kwargs)
+        use_cache = self._prepare_cache(method, url, kwargs)
         
         # Set default timeout if not provided
         if 'timeout' not in kwargs:
             kwargs['timeout'] = 30
         
         try:
-            response = self.session.get(url, **kwargs)
+            for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+                try:
+                    self._wait(url)
+                    response = self.session.request(method, url, **kwargs)
+                finally:
+                    self._release(url)
+                
+                if response.status_code != 429 or attempt == self.MAX_RATE_LIMIT_RETRIES:
+                    self._adapt(url, response)
+                    break
+                self._retry_delay(url, response, attempt)
+            
             response.raise_for_status()
-            return response
+            if use_cache:
+                response = self.cache.handle(url, response)
         except requests.exceptions.RequestException as e:
             print(f"  [!] Request failed for {url}: {e}")
             raise
+        
+        if response is None:
+            # 304 for a body that left the cache; ask again without validators
+            return self.request(method, url, **original_kwargs)
+        return response
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET request with rate limiting
+        
+        Args:
+            url: URL to request
+            **kwargs: Additional arguments to pass to requests.get
+            
+        Returns:
+            Response object
+        """
+        return self.request('GET', url, **kwargs)
     
     def post(self, url: str, **kwargs) -> requests.Response:
         """
@@ -85,19 +413,7 @@ class RateLimitedSession:
         Returns:
             Response object
         """
-        self._wait()
-        
-        # Set default timeout if not provided
-        if 'timeout' not in kwargs:
-            kwargs['timeout'] = 30
-        
-        try:
-            response = self.session.post(url, **kwargs)
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            print(f"  [!] Request failed for {url}: {e}")
-            raise
+        return self.request('POST', url, **kwargs)
     
     def close(self):
         """Close the session"""
@@ -110,3 +426,143 @@ class RateLimitedSession:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit"""
         self.close()
+
+class AsyncRateLimitedSession(RateLimitedSession):
+    """
+    Asyncio counterpart of RateLimitedSession
+    
+    Requests are started no closer together than rate_limit, but unlike
+    RateLimitedSession they don't wait for the previous response, so up
+    to max_concurrency requests can be in flight at once. Each request
+    runs on a worker thread over a shared keep-alive connection pool.
+    Rate limit headers and 429s are handled as in RateLimitedSession.
+    
+    Usage:
+        async with AsyncRateLimitedSession(0.25, max_concurrency=8) as session:
+            responses = await asyncio.gather(*(session.get(url) for url in urls))
+    """
+    
+    def __init__(self, rate_limit: float = 1.0, max_concurrency: int = 8,
+                 quotas: Optional[List[Quota]] = None, cache: Optional[HttpCache] = None):
+        """
+        Initialize async rate-limited session
+        
+        Args:
+            rate_limit: Minimum seconds between request starts (used without quotas)
+            max_concurrency: Maximum number of requests in flight
+            quotas: Per-host (max requests, window seconds) quotas, shared
+                with every other session using the same host
+            cache: On-disk cache used by requests made with cache=True
+        """
+        super().__init__(rate_limit, quotas, cache)
+        self.max_concurrency = max_concurrency
+        self.next_request = 0.0
+        
+        self.session.close()
+        self.session = build_session(pool_size=max_concurrency)
+        
+        # Created lazily so the session can be built outside a running loop
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+    
+    async def _wait(self, url: str):
+        """Reserve the next request start time and sleep until it"""
+        limiter = self._limiter(url)
+        if limiter:
+            delay = limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return
+        
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        
+        async with self._lock:
+            now = time.time()
+            start = max(now, self.next_request, self.paused_until)
+            self.next_request = start + self.gap
+        
+        if start > now:
+            await asyncio.sleep(start - now)
+    
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Request with rate limiting and bounded concurrency
+        
+        Args:
+            method: HTTP method
+            url: URL to request
+            **kwargs: Additional arguments to pass to requests
+            
+        Returns:
+            Response object
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        
+        original_kwargs = dict(kwargs)
+        use_cache = self._prepare_cache(method, url, kwargs)
+        
+        # Set default timeout if not provided
+        if 'timeout' not in kwargs:
+            kwargs['timeout'] = 30
+        
+        async with self._slots:
+            try:
+                for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+                    try:
+                        await self._wait(url)
+                        response = await asyncio.to_thread(self.session.request, method, url, **kwargs)
+                    finally:
+                        self._release(url)
+                    
+                    if response.status_code != 429 or attempt == self.MAX_RATE_LIMIT_RETRIES:
+                        self._adapt(url, response)
+                        break
+                    self._retry_delay(url, response, attempt)
+                
+                response.raise_for_status()
+                if use_cache:
+                    response = self.cache.handle(url, response)
+            except requests.exceptions.RequestException as e:
+                print(f"  [!] Request failed for {url}: {e}")
+                raise
+        
+        if response is None:
+            # 304 for a body that left the cache; ask again (outside our slot) without validators
+            return await self.request(method, url, **original_kwargs)
+        return response
+    
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET request with rate limiting
+        
+        Args:
+            url: URL to request
+            **kwargs: Additional arguments to pass to requests.get
+            
+        Returns:
+            Response object
+        """
+        return await self.request('GET', url, **kwargs)
+    
+    async def post(self, url: str, **kwargs) -> requests.Response:
+        """
+        POST request with rate limiting
+        
+        Args:
+            url: URL to request
+            **kwargs: Additional arguments to pass to requests.post
+            
+        Returns:
+            Response object
+        """
+        return await self.request('POST', url, **kwargs)
+    
+    async def __aenter__(self):
+        """Async context manager entry"""
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit"""
+        self.close()
@@ -3,8 +3,167 @@ ID extraction utilities from URLs
 File: utils/id_extractor.py
 """
 import re
-from typing import Optional
-from urllib.parse import urlparse, parse_qs
+from typing import Dict, Iterable, Optional, Tuple
+
+# Canonical service names for the aliases used around the codebase
+SERVICE_ALIASES = {
+    'myanimelist': 'mal',
+    'tmdb': 'themoviedb',
+    'thetvdb': 'tvdb',
+    'anime-planet': 'animeplanet',
+    'ann': 'animenewsnetwork',
+}
+
+# Host -> (service, pattern matched against the part of the URL after "host/")
+# Hosts are listed without "www."; other subdomains fall back to their parent domain.
+_HOST_PATTERNS = {
+    # https://anidb.net/anime/1 or ?aid=1
+    'anidb.net': ('anidb', r'(?:anime/|[^#]*?[?&]aid=)(\d+)'),
+    # https://anilist.co/anime/290 or https://anilist.co/manga/30013
+    'anilist.co': ('anilist', r'(?:anime|manga)/(\d+)'),
+    # https://myanimelist.net/anime/290 or https://myanimelist.net/manga/2
+    'myanimelist.net': ('mal', r'(?:anime|manga)/(\d+)'),
+    # https://kitsu.io/anime/265 or https://kitsu.io/anime/crest-of-the-stars
+    'kitsu.io': ('kitsu', r'(?:anime|manga)/([^/?#]+)'),
+    'kitsu.app': ('kitsu', r'(?:anime|manga)/([^/?#]+)'),
+    # https://simkl.com/anime/36462 or https://simkl.com/movies/...
+    'simkl.com': ('simkl', r'(?:anime|tv|movies?)/(\d+)'),
+    # https://www.themoviedb.org/tv/26209 or /movie/128
+    'themoviedb.org': ('themoviedb', r'(?:tv|movie)/(\d+)'),
+    # https://thetvdb.com/?tab=series&id=72025 or /series/72025 (slugs need a lookup)
+    'thetvdb.com': ('tvdb', r'(?:[^#]*?[?&]id=|(?:[^?#]*/)?series/)(\d+)(?![\w-])'),
+    # https://animecountdown.com/1234 uses TVDB IDs
+    'animecountdown.com': ('tvdb', r'(\d+)'),
+    # https://www.imdb.com/title/tt0286390/
+    'imdb.com': ('imdb', r'[^?#]*?(tt\d+)'),
+    # https://www.anime-planet.com/anime/crest-of-the-stars
+    'anime-planet.com': ('animeplanet', r'(?:anime|manga)/([\w-]+)'),
+    # https://www.animenewsnetwork.com/encyclopedia/anime.php?id=14
+    'animenewsnetwork.com': ('animenewsnetwork', r'[^#]*?[?&]id=(\d+)'),
+    # https://www.livechart.me/anime/4157
+    'livechart.me': ('livechart', r'anime/(\d+)'),
+    # https://www.anisearch.com/anime/3039
+    'anisearch.com': ('anisearch', r'(?:anime|manga)/(\d+)'),
+}
+
+class URLIDExtractor:
+    """
+    Turns service URLs into (service, id) pairs
+    
+    Every pattern is compiled once. A URL is split once into host and
+    path, the host picks the service and its pattern in a single dict
+    lookup, and that pattern is matched once against the path - instead
+    of testing every service in turn with re.search.
+    """
+    
+    def __init__(self, host_patterns: Dict[str, Tuple[str, str]] = None):
+        """
+        Initialize extractor
+        
+        Args:
+            host_patterns: Host -> (service, regex) table (default: known services)
+        """
+        host_patterns = _HOST_PATTERNS if host_patterns is None else host_patterns
+        self.hosts = {}
+        for host, (service, pattern) in host_patterns.items():
+            entry = (service, re.compile(pattern).match)
+            self.hosts[host] = entry
+            self.hosts['www.' + host] = entry
+    
+    def _lookup_host(self, host: str):
+        """Slow path for hosts not in the table as written (case, port, subdomain)"""
+        host = host.lower().partition(':')[0]
+        entry = self.hosts.get(host)
+        while entry is None and host.count('.') >= 2:
+            # cdn.animenewsnetwork.com, m.imdb.com: try the parent domain
+            host = host[host.find('.') + 1:]
+            entry = self.hosts.get(host)
+        return entry
+    
+    def parse(self, url: str) -> Optional[Tuple[str, str]]:
+        """
+        Extract the service and ID a URL points to
+        
+        Args:
+            url: Absolute URL (scheme optional, e.g. "//anidb.net/anime/1")
+        
+        Returns:
+            (service, id) or None if the host is unknown or the URL has no ID
+        """
+        if not url:
+            return None
+        
+        # "https:", "", host, rest of the URL
+        parts = url.split('/', 3)
+        if len(parts) < 4 or parts[1]:
+            return None
+        
+        entry = self.hosts.get(parts[2]) or self._lookup_host(parts[2])
+        if entry is None:
+            return None
+        
+        match = entry[1](parts[3])
+        if match is None:
+            return None
+        return entry[0], match.group(1)
+    
+    def extract_ids(self, urls: Iterable[str], ids: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Collect the IDs of several URLs
+        
+        Args:
+            urls: URLs to parse (unknown ones are skipped)
+            ids: IDs found elsewhere; these are kept over IDs from the URLs
+        
+        Returns:
+            Service -> ID mapping (the ids dict, if given)
+        """
+        if ids is None:
+            ids = {}
+        
+        # parse() inlined: this runs for every source URL of every entry
+        hosts = self.hosts
+        for url in urls:
+            if not url:
+                continue
+            parts = url.split('/', 3)
+            if len(parts) < 4 or parts[1]:
+                continue
+            entry = hosts.get(parts[2]) or self._lookup_host(parts[2])
+            if entry is None or entry[0] in ids:
+                continue
+            match = entry[1](parts[3])
+            if match is not None:
+                ids[entry[0]] = match.group(1)
+        return ids
+
+# Shared instance used by the scrapers
+url_id_extractor = URLIDExtractor()
+
+def parse_url(url: str) -> Optional[Tuple[str, str]]:
+    """
+    Extract (service, id) from a service URL
+    
+    Args:
+        url: URL to parse
+    
+    Returns:
+        (service, id) or None if not recognized
+    """
+    return url_id_extractor.parse(url)
+
+def extract_ids_from_urls(urls: Iterable[str], ids: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Extract service IDs from a list of URLs
+    
+    Args:
+        urls: URLs to parse
+        ids: IDs found elsewhere, kept over IDs from the URLs
+    
+    Returns:
+        Service -> ID mapping
+    """
+    return url_id_extractor.extract_ids(urls, ids)
 
 def extract_id_from_url(url: str, service: str) -> Optional[str]:
     """
@@ -13,119 +172,18 @@ def extract_id_from_url(url: str, service: str) -> Optional[str]:
     Args:
         url: URL to parse
         service: Service name
-        
+    
     Returns:
-        Extracted ID or None if not found
+        Extracted ID or None if not found (or the URL belongs to another service)
     """
-    
-    if not url:
+    parsed = url_id_extractor.parse(url)
+    if parsed is None:
         return None
     
     service = service.lower()
-    
-    try:
-        # AniDB
-        if service == 'anidb':
-            # Format: https://anidb.net/anime/1 or ?aid=1
-            match = re.search(r'aid=(\d+)', url)
-            if match:
-                return match.group(1)
-            match = re.search(r'/anime/(\d+)', url)
-            if match:
-                return match.group(1)
-        
-        # AniList
-        elif service == 'anilist':
-            # Format: https://anilist.co/anime/290 or https://anilist.co/manga/30013
-            match = re.search(r'/(?:anime|manga)/(\d+)', url)
-            if match:
-                return match.group(1)
-        
-        # MyAnimeList
-        elif service in ['mal', 'myanimelist']:
-            # Format: https://myanimelist.net/anime/290 or https://myanimelist.net/manga/2
-            match = re.search(r'/(?:anime|manga)/(\d+)', url)
-            if match:
-                return match.group(1)
-        
-        # Kitsu
-        elif service == 'kitsu':
-            # Format: https://kitsu.io/anime/265 or https://kitsu.io/anime/crest-of-the-stars
-            match = re.search(r'/(?:anime|manga)/([^/?]+)', url)
-            if match:
-                return match.group(1)
-        
-        # SIMKL
-        elif service == 'simkl':
-            # Format: https://simkl.com/anime/36462 or https://simkl.com/movies/...
-            match = re.search(r'/(?:anime|movies|tv)/(\d+)', url)
-            if match:
-                return match.group(1)
-        
-        # TMDB (The Movie Database)
-        elif service in ['themoviedb', 'tmdb']:
-            # Format: https://www.themoviedb.org/tv/26209 or /movie/128
-            match = re.search(r'/(?:tv|movie)/(\d+)', url)
-            if match:
-                return match.group(1)
-        
-        # TVDB (The TV Database)
-        elif service in ['thetvdb', 'tvdb']:
-            # Format: https://thetvdb.com/series/crest-of-the-stars or ?id=72025
-            match = re.search(r'[?&]id=(\d+)', url)
-            if match:
-                return match.group(1)
-            match = re.search(r'/series/([^/?]+)', url)
-            if match:
-                # Could be slug or ID
-                series_id = match.group(1)
-                if series_id.isdigit():
-                    return series_id
-                # For slug, we'd need to look it up, return slug for now
-                return series_id
-        
-        # IMDB
-        elif service == 'imdb':
-            # Format: https://www.imdb.com/title/tt0286390/
-            match = re.search(r'(tt\d+)', url)
-            if match:
-                return match.group(1)
-        
-        # Anime-Planet
-        elif service in ['animeplanet', 'anime-planet']:
-            # Format: https://www.anime-planet.com/anime/crest-of-the-stars
-            parsed = urlparse(url)
-            path_parts = [p for p in parsed.path.strip('/').split('/') if p]
-            if len(path_parts) >= 2:
-                # Return the slug (last part of path)
-                return path_parts[-1]
-        
-        # AnimeNewsNetwork
-        elif service in ['animenewsnetwork', 'ann']:
-            # Format: https://www.animenewsnetwork.com/encyclopedia/anime.php?id=14
-            match = re.search(r'[?&]id=(\d+)', url)
-            if match:
-                return match.group(1)
-        
-        # Livechart
-        elif service == 'livechart':
-            # Format: https://www.livechart.me/anime/4157
-            match = re.search(r'/anime/(\d+)', url)
-            if match:
-                return match.group(1)
-        
-        # Anisearch
-        elif service == 'anisearch':
-            # Format: https://www.anisearch.com/anime/3039
-            match = re.search(r'/anime/(\d+)', url)
-            if match:
-                return match.group(1)
-        
-        return None
-        
-    except Exception as e:
-        print(f"  [WARN] Failed to extract ID from {url}: {e}")
+    if parsed[0] != SERVICE_ALIASES.get(service, service):
         return None
+    return parsed[1]
 
 def normalize_id(id_value: any) -> Optional[str]:
     """
@@ -133,7 +191,7 @@ def normalize_id(id_value: any) -> Optional[str]:
     
     Args:
         id_value: ID in any format
-        
+    
     Returns:
         Normalized string ID or None
     """
@@ -155,7 +213,7 @@ def is_valid_id(id_value: any, service: str) -> bool:
     Args:
         id_value: ID to validate
         service: Service name
-        
+    
     Returns:
         True if valid, False otherwise
     """
@@ -0,0 +1,180 @@
+"""
+Streaming reader for one large array in a JSON document
+File: utils/json_stream.py
+"""
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+# Everything up to the next bracket outside a string, strings skipped whole
+_TO_BRACKET = re.compile(rb'(?:[^"{}\[\]]|"(?:[^"\\]|\\.)*")*([{}\[\]])', re.S)
+# One complete string literal
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+# A '}' that may close an array element
+_ELEMENT_END = re.compile(rb'\}\s*(?:,\s*\{|\])')
+# First byte of the next array element, or the end of the array
+_VALUE_START = re.compile(rb'[^\s,]')
+
+def _balanced(element: bytes) -> bool:
+    """True if the braces outside strings balance and the text does not end inside a string"""
+    if b'\\' in element:
+        # Escaped quotes break quote parity, strip the strings instead
+        outside = _STRING.sub(b'', element)
+        if b'"' in outside:
+            return False
+    else:
+        parts = element.split(b'"')
+        if len(parts) % 2 == 0:
+            return False
+        outside = b''.join(parts[::2])
+    return outside.count(b'{') == outside.count(b'}')
+
+class JsonArrayStream:
+    """
+    Yield the objects of a top-level array one at a time
+    
+    Meant for documents shaped like {"...": ..., "data": [{...}, {...}]}.
+    The input is consumed chunk by chunk (e.g. response.iter_content) and
+    only the element being scanned is held in memory. Element boundaries
+    are found by counting brackets outside strings, so an element can be
+    tested against a byte pattern before it is decoded at all.
+    
+    Usage:
+        stream = JsonArrayStream(response.iter_content(65536), 'data')
+        print(stream.header.get('lastUpdate'))
+        for entry in stream.items(contains=b'simkl.com'):
+            ...
+    """
+    
+    def __init__(self, chunks: Iterable[bytes], key: str = 'data'):
+        """
+        Initialize stream
+        
+        Args:
+            chunks: Byte chunks of the document
+            key: Top-level key of the array
+        """
+        self.chunks = iter(chunks)
+        self.key_pattern = re.compile(rb'"' + re.escape(key.encode('utf-8')) + rb'"\s*:\s*\[$')
+        self.count = 0  # elements scanned so far (matching the filter or not)
+        self._header: Optional[Dict[str, Any]] = None
+        self._buffer = b''
+        self._base = 0  # input offset of the start of the buffer
+        self._pos = 0
+        self._finished = False
+    
+    def _fill(self, keep: int) -> bool:
+        """
+        Read the next chunk, dropping the buffer before keep
+        
+        Returns:
+            False at the end of the input
+        """
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            return False
+        self._buffer = self._buffer[keep:] + chunk
+        self._base += keep
+        self._pos -= keep
+        return True
+    
+    def _next_bracket(self, keep: int) -> Optional[re.Match]:
+        """Match up to the next bracket, reading more input as needed"""
+        while True:
+            match = _TO_BRACKET.match(self._buffer, self._pos)
+            if match:
+                self._pos = match.end()
+                return match
+            if not self._fill(keep):
+                return None
+            keep = 0
+    
+    @property
+    def header(self) -> Dict[str, Any]:
+        """
+        Top-level fields that precede the array (read on first access)
+        
+        Raises:
+            ValueError: If the document has no such top-level array
+        """
+        if self._header is None:
+            depth = 0
+            while True:
+                match = self._next_bracket(0)
+                if match is None:
+                    raise ValueError("Array not found in JSON document")
+                bracket = match.group(1)
+                if bracket in b'{[':
+                    depth += 1
+                    if depth == 2 and bracket == b'[' and self.key_pattern.search(match.group(0)):
+                        break
+                else:
+                    depth -= 1
+            
+            # Close the array and the object to decode what came before it
+            self._header = json.loads(self._buffer[:self._pos] + b']}')
+            self._buffer = self._buffer[self._pos:]
+            self._base += self._pos
+            self._pos = 0
+        return self._header
+    
+    def raw_items(self) -> Iterator[bytes]:
+        """
+        Yield the undecoded bytes of every object in the array
+        
+        Element ends are found with byte searches and counts rather than a
+        Python loop over tokens, which keeps the scan close to the speed of
+        json.loads while only ever decoding the elements asked for.
+        
+        Raises:
+            ValueError: If the array holds something other than objects or
+                the document ends inside it
+        """
+        self.header  # read past the fields before the array
+        
+        while not self._finished:
+            # Skip separators up to the next element (or the end of the array)
+            match = _VALUE_START.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+                if not self._fill(self._pos):
+                    raise ValueError("JSON document ended inside the array")
+                continue
+            
+            self._pos = match.start()
+            if match.group() == b']':
+                self._finished = True
+                break
+            if match.group() != b'{':
+                raise ValueError(f"Expected an object in the array, got {match.group()!r}")
+            
+            # Candidate ends are '}' followed by ',{' or ']'; the first one
+            # where the braces outside strings balance is the real end
+            start = search = self._base + self._pos
+            while True:
+                match = _ELEMENT_END.search(self._buffer, search - self._base)
+                if match is None:
+                    if not self._fill(start - self._base):
+                        raise ValueError("JSON document ended inside the array")
+                    continue
+                
+                end = match.start()
+                search = self._base + end + 1
+                if _balanced(self._buffer[start - self._base:end + 1]):
+                    break
+            
+            self._pos = end + 1
+            self.count += 1
+            yield self._buffer[start - self._base:self._pos]
+    
+    def items(self, contains: Optional[bytes] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the decoded objects of the array
+        
+        Args:
+            contains: Only decode elements whose raw bytes include this
+                (a cheap prefilter; the caller still checks the decoded item)
+        """
+        for raw in self.raw_items():
+            if contains is None or contains in raw:
+                yield json.loads(raw)
@@ -0,0 +1,223 @@
+"""
+Local versioned copy of the anime-offline-database with a cross-ID index
+File: utils/offline_database.py
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from utils.file_utils import load_json, save_json
+from utils.id_extractor import extract_ids_from_urls
+from utils.json_stream import JsonArrayStream
+
+DATABASE_URL = "https://github.com/manami-project/anime-offline-database/releases/latest/download/anime-offline-database-minified.json"
+
+class OfflineDatabase:
+    """
+    anime-offline-database release stored on disk, keyed by its lastUpdate
+    
+    Each version lives in <store_dir>/<lastUpdate>/ as the database itself
+    (database.json) and the service IDs found in every entry's sources
+    (ids.json, one {service: id} dict per entry, in entry order). The
+    current version is recorded in <store_dir>/current.json. Lookups such
+    as "cross IDs of livechart:4157" only need ids.json, so scrapers and
+    mappers can query the store without loading the full entries.
+    """
+    
+    CURRENT_FILE = "current.json"
+    KEEP_VERSIONS = 2
+    CHUNK_SIZE = 1 << 16
+    
+    def __init__(self, store_dir: Union[str, Path] = "cache/offline-database"):
+        """
+        Initialize store
+        
+        Args:
+            store_dir: Directory holding the stored versions
+        """
+        self.store_dir = Path(store_dir)
+        self.last_update: Optional[str] = None
+        self.ids: List[Dict[str, str]] = []
+        self._index: Optional[Dict[str, int]] = None
+    
+    @property
+    def version_dir(self) -> Path:
+        return self.store_dir / self.last_update
+    
+    @property
+    def database_file(self) -> Path:
+        return self.version_dir / "database.json"
+    
+    def refresh(self, session) -> 'OfflineDatabase':
+        """
+        Download the latest release (conditionally) and store it if it is a new version
+        
+        Args:
+            session: RateLimitedSession; the request revalidates against its HTTP cache
+        
+        Returns:
+            self
+        """
+        print("Fetching anime-offline-database...")
+        response = session.get(DATABASE_URL, cache=True)
+        
+        # Not modified since the last download: the stored version is current
+        if getattr(response, 'from_cache', False) and (self.store_dir / self.CURRENT_FILE).exists():
+            try:
+                self.open()
+                if self.database_file.stat().st_size != int(response.headers.get('Content-Length', -1)):
+                    raise FileNotFoundError(f"Stored copy differs from {response.cache_path}")
+                response.close()
+                print(f"✓ anime-offline-database {self.last_update} not modified")
+                return self
+            except (FileNotFoundError, KeyError, json.JSONDecodeError):
+                pass  # store is behind the HTTP cache, rebuild it from the body
+        
+        # Stream the body: the header says which version this is, and the
+        # entries are indexed one at a time while the raw bytes go to disk
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.store_dir / "database.json.tmp"
+        try:
+            with open(tmp_path, 'wb') as out:
+                chunks = _copy_chunks(response.iter_content(self.CHUNK_SIZE), out)
+                stream = JsonArrayStream(chunks, 'data')
+                self.last_update = str(stream.header.get('lastUpdate', 'unknown'))
+                
+                if (self.version_dir / "ids.json").exists() and self.database_file.exists():
+                    response.close()
+                    print(f"✓ anime-offline-database {self.last_update} already stored")
+                    return self.open(self.last_update)
+                
+                print(f"Storing anime-offline-database {self.last_update}...")
+                self.ids = [extract_ids_from_urls(entry.get('sources', [])) for entry in stream.items()]
+                for _ in chunks:
+                    pass  # rest of the document, so the copy (and the HTTP cache entry) is complete
+            
+            self.version_dir.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, self.database_file)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        
+        print(f"✓ Indexed {len(self.ids)} entries")
+        self._index = None
+        save_json(self.version_dir / "ids.json", self.ids)
+        save_json(self.store_dir / self.CURRENT_FILE, {"last_update": self.last_update})
+        
+        self.prune()
+        return self
+    
+    def open(self, version: Optional[str] = None) -> 'OfflineDatabase':
+        """
+        Open a stored version without going to the network
+        
+        Args:
+            version: lastUpdate of the version (default: the current one)
+        
+        Returns:
+            self
+        
+        Raises:
+            FileNotFoundError: If nothing (or not that version) is stored
+        """
+        if version is None:
+            version = load_json(self.store_dir / self.CURRENT_FILE)["last_update"]
+        
+        self.last_update = version
+        self.ids = load_json(self.version_dir / "ids.json")
+        self._index = None
+        return self
+    
+    def prune(self):
+        """Delete all but the KEEP_VERSIONS most recently stored versions"""
+        versions = sorted(
+            (path for path in self.store_dir.iterdir() if path.is_dir()),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True
+        )
+        for path in versions[self.KEEP_VERSIONS:]:
+            if path.name != self.last_update:
+                shutil.rmtree(path, ignore_errors=True)
+    
+    @property
+    def index(self) -> Dict[str, int]:
+        """'service:id' -> entry number, built on first use"""
+        if self._index is None:
+            self._index = {}
+            for number, ids in enumerate(self.ids):
+                for service, item_id in ids.items():
+                    self._index.setdefault(f"{service}:{item_id}", number)
+        return self._index
+    
+    def find(self, service: str, item_id: Any) -> Optional[int]:
+        """Entry number of the entry linking service:item_id, if any"""
+        return self.index.get(f"{service}:{item_id}")
+    
+    def cross_ids(self, service: str, item_id: Any,
+                  ids: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        IDs on other services of the entry linking service:item_id
+        
+        Args:
+            service: Service name as produced by the URL extractor (e.g. 'livechart')
+            item_id: ID on that service
+            ids: IDs already known; these are kept over the database's
+        
+        Returns:
+            Service -> ID mapping (the ids dict, if given; empty if unknown)
+        """
+        if ids is None:
+            ids = {}
+        number = self.find(service, item_id)
+        if number is not None:
+            for other, other_id in self.ids[number].items():
+                ids.setdefault(other, other_id)
+        return ids
+    
+    def entries(self, contains: Optional[bytes] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the entries of the stored version
+        
+        Args:
+            contains: Only decode entries whose raw JSON includes these bytes
+                (e.g. b'simkl.com'); the rest are skipped undecoded
+        """
+        with open(self.database_file, 'rb') as f:
+            chunks = iter(lambda: f.read(self.CHUNK_SIZE), b'')
+            yield from JsonArrayStream(chunks, 'data').items(contains)
+
+def _copy_chunks(chunks: Iterator[bytes], out) -> Iterator[bytes]:
+    """Pass chunks through while writing them to out"""
+    for chunk in chunks:
+        out.write(chunk)
+        yield chunk
+
+# Loaded at most once per process and shared by every scraper that asks for it
+_shared: Optional[OfflineDatabase] = None
+
+def get_offline_database(session) -> Optional[OfflineDatabase]:
+    """
+    The current anime-offline-database, refreshed once per process
+    
+    Args:
+        session: RateLimitedSession used for the (conditional) download
+    
+    Returns:
+        The database, or None if it could not be fetched and nothing is stored
+    """
+    global _shared
+    if _shared is not None:
+        return _shared
+    
+    database = OfflineDatabase()
+    try:
+        _shared = database.refresh(session)
+    except Exception as e:
+        print(f"  [WARN] Could not refresh anime-offline-database: {e}")
+        try:
+            _shared = database.open()
+            print(f"  Using stored anime-offline-database {_shared.last_update}")
+        except (FileNotFoundError, KeyError, json.JSONDecodeError):
+            return None
+    return _shared
@@ -0,0 +1,161 @@
+"""
+Pool of browser-impersonating sessions with per-session pacing and health
+File: utils/session_pool.py
+"""
+import asyncio
+import random
+import time
+from typing import List, Optional
+
+from curl_cffi import requests as cffi_requests
+
+class PooledSession:
+    """
+    One impersonated browser session
+    
+    Requests through a session are spaced at least interval (+ jitter)
+    apart, stretched up to 2x while its health is low. A block sends the
+    session into quarantine with an exponential cooldown and a fresh
+    fingerprint; successes slowly restore its health.
+    """
+    
+    BLOCK_PENALTY = 0.4
+    ERROR_PENALTY = 0.2
+    RECOVERY = 0.1
+    BASE_COOLDOWN = 30.0    # seconds of quarantine after the first block
+    MAX_COOLDOWN = 300.0
+    ERROR_COOLDOWN = 10.0   # connection errors
+    
+    def __init__(self, name: str, browsers: List[str], interval: float, jitter: float = 0.0,
+                 browser: Optional[str] = None):
+        """
+        Initialize session
+        
+        Args:
+            name: Label for log lines
+            browsers: Fingerprints to pick from (curl_cffi impersonate targets)
+            interval: Minimum seconds between requests of this session
+            jitter: Extra random delay of up to this many seconds per request
+            browser: Starting fingerprint (default: a random one)
+        """
+        self.name = name
+        self.browsers = browsers
+        self.interval = interval
+        self.jitter = jitter
+        self.health = 1.0
+        self.strikes = 0            # consecutive blocks
+        self.next_request = 0.0     # time.monotonic() before which we must not send
+        self.quarantined_until = 0.0
+        self.browser: Optional[str] = None
+        self.session = None
+        self.rotate(browser)
+    
+    def rotate(self, browser: Optional[str] = None):
+        """Replace the session with one using the given (or another random) fingerprint"""
+        if browser is None:
+            choices = [b for b in self.browsers if b != self.browser] or self.browsers
+            browser = random.choice(choices)
+        self.browser = browser
+        if self.session is not None:
+            self.session.close()
+        self.session = cffi_requests.Session(impersonate=self.browser)
+    
+    @property
+    def quarantined(self) -> bool:
+        return time.monotonic() < self.quarantined_until
+    
+    async def wait_ready(self):
+        """Sleep until this session may send its next request"""
+        delay = max(self.next_request, self.quarantined_until) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    async def get(self, url: str, **kwargs):
+        """
+        GET through this session once it is ready
+        
+        Args:
+            url: URL to fetch
+            **kwargs: Passed to curl_cffi
+        
+        Returns:
+            curl_cffi Response
+        """
+        await self.wait_ready()
+        try:
+            return await asyncio.to_thread(self.session.get, url, **kwargs)
+        finally:
+            pace = self.interval * (2.0 - self.health) + random.uniform(0, self.jitter)
+            self.next_request = time.monotonic() + pace
+    
+    def record_success(self):
+        self.strikes = 0
+        self.health = min(1.0, self.health + self.RECOVERY)
+    
+    def record_block(self) -> float:
+        """
+        Quarantine the session after a block and give it a new fingerprint
+        
+        Returns:
+            Seconds of quarantine
+        """
+        self.strikes += 1
+        self.health = max(0.0, self.health - self.BLOCK_PENALTY)
+        cooldown = min(self.MAX_COOLDOWN, self.BASE_COOLDOWN * 2 ** (self.strikes - 1))
+        cooldown *= random.uniform(1.0, 1.5)
+        self.quarantined_until = time.monotonic() + cooldown
+        self.rotate()
+        return cooldown
+    
+    def record_error(self) -> float:
+        """
+        Back off briefly after a connection error and reconnect
+        
+        Returns:
+            Seconds of quarantine
+        """
+        self.health = max(0.0, self.health - self.ERROR_PENALTY)
+        self.quarantined_until = time.monotonic() + self.ERROR_COOLDOWN
+        self.rotate()
+        return self.ERROR_COOLDOWN
+    
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+class SessionPool:
+    """A fixed number of PooledSessions with distinct starting fingerprints"""
+    
+    def __init__(self, size: int, browsers: List[str], interval: float, jitter: float = 0.0):
+        """
+        Initialize pool
+        
+        Args:
+            size: Number of sessions
+            browsers: Fingerprints to pick from
+            interval: Minimum seconds between requests of each session
+            jitter: Extra random delay of up to this many seconds per request
+        """
+        starts = random.sample(browsers, len(browsers))
+        self.sessions = [
+            PooledSession(f"s{index + 1}", browsers, interval, jitter, starts[index % len(starts)])
+            for index in range(size)
+        ]
+    
+    def summary(self) -> str:
+        """One-line state of every session, e.g. 's1 chrome120 1.00 | s2 safari15_5 0.60 (quarantined)'"""
+        return " | ".join(
+            f"{s.name} {s.browser} {s.health:.2f}" + (" (quarantined)" if s.quarantined else "")
+            for s in self.sessions
+        )
+    
+    def close(self):
+        for session in self.sessions:
+            session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()